@@ -1,6 +1,10 @@
 from cashflows.analysis import *
 from cashflows.tvmm import *
+from cashflows.factors import *
+from cashflows.curve import *
 from cashflows.bond import *
+from cashflows.lattice import *
+from cashflows.simulation import *
 from cashflows.common import *
 from cashflows.currency import *
 from cashflows.depreciation import *
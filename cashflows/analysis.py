@@ -11,6 +11,12 @@ cashflows:
 * ``timevalue``: computes the equivalent net value of a cashflow in a specified
   time moment.
 
+* ``timevalue_profile``: computes the equivalent net value of a cashflow in
+  every time moment.
+
+* ``npv_profile``: computes the net present value of cashflows for a grid of
+  interest rates.
+
 * ``net_uniform_series``: computes the periodic equivalent net value of a
   cashflow for a specified number of payments.
 
@@ -19,6 +25,9 @@ cashflows:
 
 * ``irr``:  calculates the periodic internal rate of return of a cashflow.
 
+* ``irr_roots``:  calculates all the periodic internal rates of return of
+  cashflows with several sign changes.
+
 * ``mirr``:  calculates the periodic modified internal rate of return of a
   cashflow.
 
@@ -37,12 +46,62 @@ import pandas as pd
 # cashflows.
 from cashflows.timeseries import *
 from cashflows.rate import *
-from cashflows.common import _vars2list
-from cashflows.tvmm import tvmm
+from cashflows.common import _expand_bracket, _newton_bisect
+from cashflows.curve import DiscountCurve, PiecewiseRate
 
 # from cashflows.utilityfun import exp_utility_fun, log_utility_fun, sqrt_utility_fun
 
 
+def _as_matrix(cflo):
+    """Returns the cashflows as a matrix with a row for each cashflow and a
+    function that rebuilds the result of the rows (a float for a single
+    cashflow, a ``pandas.Series`` for a list of cashflows or a
+    ``pandas.DataFrame``, and a ``numpy.array`` for a 2-D array)."""
+    if isinstance(cflo, pd.Series):
+        return cflo.values[np.newaxis, :].astype(np.float64), lambda x: x[0]
+    if isinstance(cflo, pd.DataFrame):
+        return cflo.values.astype(np.float64), lambda x: pd.Series(x, index=cflo.index)
+    if isinstance(cflo, np.ndarray):
+        if cflo.ndim == 1:
+            return cflo[np.newaxis, :].astype(np.float64), lambda x: x[0]
+        return cflo.astype(np.float64), lambda x: x
+    verify_period_range(cflo)
+    matrix = np.array([xcflo.values for xcflo in cflo], dtype=np.float64)
+    if len(cflo) == 1:
+        return matrix, lambda x: x[0]
+    return matrix, lambda x: pd.Series(x, dtype=np.float64)
+
+
+def _log_compound(prate, nper):
+    """Logarithm of the compounding factors from period 0 to the periods
+    ``0, ..., nper - 1`` of a periodic rate (a number or a time series in
+    percentage; the rate of the period 0 is not used)."""
+    if isinstance(prate, pd.Series):
+        if len(prate) != nper:
+            raise ValueError('Rates and cashflows must have the same length')
+        growth = np.log1p(prate.values / 100)
+    else:
+        growth = np.full(nper, np.log1p(prate / 100))
+    return np.concatenate([[0.0], np.cumsum(growth[1:])])
+
+
+def _discount_vector(prate, nper, base_date=0, index=None):
+    """Discount factors of the periods ``0, ..., nper - 1`` to ``base_date`` for
+    a periodic rate (``pandas.Series``), a discount curve or a piecewise
+    constant rate. ``index`` is used to find the position of a date when
+    ``prate`` is not a time series."""
+    if isinstance(prate, (DiscountCurve, PiecewiseRate)):
+        if isinstance(base_date, str):
+            base_date = period2pos(index, pd.Period(base_date, freq=index.freq))
+        return prate.discount(np.arange(nper)) / prate.discount(base_date)
+    if not isinstance(prate, pd.Series):
+        raise TypeError("`prate` must be a pandas.Series")
+    if isinstance(base_date, str):
+        base_date = period2pos(prate.axes[0], pd.Period(base_date, freq=prate.axes[0].freq))
+    log_factor = -_log_compound(prate, nper)
+    return np.exp(log_factor - log_factor[base_date])
+
+
 def irr(cflo):
     """Computes the internal rate of return of a generic cashflow as a periodic
     interest rate.
@@ -53,6 +112,9 @@ def irr(cflo):
     Returns:
         Float or list of floats.
 
+    A cashflow with several sign changes can have several internal rates of
+    return; ``irr_roots`` computes all of them.
+
     **Examples.**
 
     >>> cflo = cashflow([-200] + [100]*4, start='2000Q1', freq='Q')
@@ -76,18 +138,179 @@ def irr(cflo):
     return retval
 
 
+def irr_roots(cflo, tol=1e-7):
+    """Computes all the internal rates of return of generic cashflows as
+    periodic interest rates.
+
+    Args:
+        cflo (pandas.Series, list, pandas.DataFrame, numpy.array): Generic
+            cashflow, list of cashflows or matrix with a cashflow in each row.
+        tol (float): maximum relative imaginary part of the roots of the
+            polynomial that are accepted as real roots.
+
+    Returns:
+        A tuple ``(roots, counts)``: the sorted internal rates of return of
+        each cashflow (a ``numpy.array`` for a single cashflow and a list of
+        arrays otherwise) and the number of rates of each cashflow.
+
+    The internal rates of return are the roots ``y = 1 + r > 0`` of the
+    polynomial with the values of the cashflow as coefficients. By the
+    Descartes' rule of signs, a cashflow without sign changes has no rates
+    and a cashflow with one sign change (a conventional cashflow) has exactly
+    one rate. The rates of the conventional cashflows are computed together
+    with a safeguarded Newton-Raphson method; the other cashflows are grouped
+    by the degree of the polynomial, and all the roots of each group are
+    computed as the eigenvalues of a stack of companion matrices.
+
+    **Examples.**
+
+    >>> cflo = cashflow([-200] + [100]*4, start='2000Q1', freq='Q')
+    >>> irr_roots(cflo) # doctest: +ELLIPSIS
+    (array([34.90...]), 1)
+
+    A cashflow with two sign changes can have two rates:
+
+    >>> roots, counts = irr_roots(np.array([[-100, 230, -132, 0],
+    ...                                     [-200, 100, 100, 0],
+    ...                                     [100, 100, 100, 100],
+    ...                                     [-100, 300, -300, 100.5]]))
+    >>> counts
+    array([2, 1, 0, 1])
+    >>> [x.round(4) for x in roots]
+    [array([10., 20.]), array([0.]), array([], dtype=float64), array([17.0998])]
+
+    Multiple roots are kept as they are found by the eigenvalues:
+
+    >>> roots, counts = irr_roots(np.array([-5, 5, 3, -4, 3, -2, 1, -1]))
+    >>> counts
+    2
+    >>> np.abs(roots).max() < 1e-8
+    True
+
+    """
+    #pylint: disable=too-many-locals
+    single = isinstance(cflo, pd.Series) or (isinstance(cflo, np.ndarray) and cflo.ndim == 1)
+    if isinstance(cflo, pd.Series):
+        cflo = [cflo]
+    matrix, rebuild = _as_matrix(cflo)
+    nrows, nper = matrix.shape
+    rows = np.arange(nrows)[:, np.newaxis]
+
+    #
+    # sign changes of the nonzero values (Descartes' rule of signs)
+    #
+    signs = np.sign(matrix)
+    nonzero = signs != 0
+    last = np.maximum.accumulate(np.where(nonzero, np.arange(nper), -1), axis=1)
+    before = np.concatenate([np.full((nrows, 1), -1), last[:, :-1]], axis=1)
+    previous = np.where(before >= 0, signs[rows, np.maximum(before, 0)], 0)
+    changes = (nonzero & (previous != 0) & (signs != previous)).sum(axis=1)
+
+    #
+    # coefficients from the first to the last nonzero value
+    #
+    first = np.argmax(nonzero, axis=1)
+    length = last[:, -1] - first + 1
+    position = first[:, np.newaxis] + np.arange(nper)
+    coeffs = np.where(position < nper, matrix[rows, np.minimum(position, nper - 1)], 0)
+
+    roots = [np.array([]) for _ in range(nrows)]
+
+    # conventional cashflows: g(x) = sum coeffs[t] * x ** t, x = 1 / (1 + r)
+    conventional = np.flatnonzero(changes == 1)
+    if len(conventional) > 0:
+        xcoeffs = coeffs[conventional]
+
+        def horner(x):
+            """Values and derivatives of g at x."""
+            value = np.zeros_like(x)
+            dvalue = np.zeros_like(x)
+            for index in range(nper - 1, -1, -1):
+                dvalue = dvalue * x + value
+                value = value * x + xcoeffs[:, index]
+            return value, dvalue
+
+        def fun(x):
+            return horner(x)[0]
+
+        def dfun(x):
+            return horner(x)[1]
+
+        lower, upper = _expand_bracket(fun, np.zeros(len(conventional)),
+                                       np.ones(len(conventional)))
+        xroot, _ = _newton_bisect(fun, np.minimum(upper, 1) / 2, lower, upper, dfun=dfun)
+        for row, xvalue in zip(conventional, xroot):
+            roots[row] = np.array([100 * (1 / xvalue - 1)])
+
+    # non-conventional cashflows: roots of p(y) = sum coeffs[t] * y ** (n - t)
+    for degree in np.unique(length[changes >= 2] - 1):
+        group = np.flatnonzero((changes >= 2) & (length - 1 == degree))
+        monic = coeffs[group, 1:degree + 1] / coeffs[group, :1]
+        companion = np.zeros((len(group), degree, degree))
+        companion[:, 0, :] = -monic
+        companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1
+        eigen = np.linalg.eigvals(companion)
+        real = np.abs(eigen.imag) <= tol * np.maximum(1, np.abs(eigen.real))
+        yroot = eigen.real
+
+        def horner_monic(y, monic=monic, degree=degree):
+            """Values, derivatives and bounds of the rounding error of the
+            monic polynomial at y."""
+            value = np.ones_like(y)
+            dvalue = np.zeros_like(y)
+            bound = np.ones_like(y)
+            for index in range(degree):
+                dvalue = dvalue * y + value
+                value = value * y + monic[:, index, np.newaxis]
+                bound = bound * np.abs(y) + np.abs(monic[:, index, np.newaxis])
+            return value, dvalue, bound
+
+        #
+        # Newton steps are kept only when they reduce |p(y)|; they are skipped
+        # near multiple roots, where the derivative vanishes
+        #
+        for _ in range(2):
+            value, dvalue, bound = horner_monic(yroot)
+            flat = np.abs(dvalue) <= np.sqrt(np.finfo(float).eps) * bound
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.where(flat, 0, value / dvalue)
+            candidate = yroot - np.where(real & np.isfinite(step), step, 0)
+            better = np.abs(horner_monic(candidate)[0]) < np.abs(value)
+            yroot = np.where(better, candidate, yroot)
+        for row, xreal, xroot in zip(group, real, yroot):
+            roots[row] = np.sort(100 * (xroot[xreal & (xroot > 0)] - 1))
+
+    counts = np.array([len(x) for x in roots])
+    if single:
+        return roots[0], counts[0]
+    return roots, rebuild(counts)
+
+
 ## modified internal rate of return
 def mirr(cflo, finance_rate=0, reinvest_rate=0):
     """Computes the modified internal rate of return of a generic cashflow
     as a periodic interest rate.
 
     Args:
-        cflo (pandas.Series): Generic cashflow.
-        finance_rate (float): Periodic interest rate applied to negative values of the cashflow.
-        reinvest_rate (float): Periodic interest rate applied to positive values of the cashflow.
+        cflo (pandas.Series, list, pandas.DataFrame, numpy.array): Generic
+            cashflow, list of cashflows or matrix with a cashflow in each row.
+        finance_rate (float, pandas.Series): Periodic interest rate applied to
+            negative values of the cashflow, as a fraction (``0.05`` for 5%),
+            as in ``numpy.mirr``.
+        reinvest_rate (float, pandas.Series): Periodic interest rate applied to
+            positive values of the cashflow, as a fraction.
 
     Returns:
-        Float or list of floats.
+        The modified internal rate of return in percentage: a float for a
+        single cashflow, a ``pandas.Series`` for a list of cashflows or a
+        ``pandas.DataFrame``, and a ``numpy.array`` for a 2-D array.
+
+    The negative values are discounted to the first period at the finance
+    rate and the positive values are compounded to the last period at the
+    reinvestment rate. The rates can change over time: the compounding
+    factors are cumulative products (computed as cumulative sums of
+    logarithms) of the rates, and all the cashflows are processed with two
+    matrix products.
 
     **Examples.**
 
@@ -100,19 +323,31 @@ def mirr(cflo, finance_rate=0, reinvest_rate=0):
     1    18.920712
     dtype: float64
 
+    >>> mirr(cflo, finance_rate=0.02, reinvest_rate=0.03) # doctest: +ELLIPSIS
+    20.26...
+
+    Rates that change over time are time series of fractions, so a rate built
+    with ``interest_rate`` (in percentage) is divided by 100:
+
+    >>> reinvest_rate = interest_rate([3, 3, 3, 5, 5], start='2000Q1', freq='Q') / 100
+    >>> mirr(np.array([[-200, 100, 100, 100, 100], [-100, -100, 150, 150, 0]]),
+    ...      finance_rate=0.02, reinvest_rate=reinvest_rate) # doctest: +ELLIPSIS
+    array([21.00..., 12.99...])
 
     """
     # negativos: finance_rate
     # positivos: reinvest_rate
-    if isinstance(cflo, pd.Series):
-        cflo = [cflo]
-    retval = pd.Series([0] * len(cflo), dtype=np.float64)
-    for index, xcflo in enumerate(cflo):
-        retval[index] = 100 * np.mirr(xcflo, finance_rate, reinvest_rate)
-
-    if len(retval) == 1:
-        return retval[0]
-    return retval
+    matrix, rebuild = _as_matrix(cflo)
+    nper = matrix.shape[1]
+    # the rates are fractions; _log_compound takes percentages
+    finance = _log_compound(finance_rate * 100, nper)
+    reinvest = _log_compound(reinvest_rate * 100, nper)
+    pval = -np.minimum(matrix, 0).dot(np.exp(-finance))
+    fval = np.maximum(matrix, 0).dot(np.exp(reinvest[-1] - reinvest))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retval = 100 * np.expm1(np.log(fval / pval) / (nper - 1))
+    retval = np.where((pval > 0) & (fval > 0), retval, np.nan)
+    return rebuild(retval)
 
 
 def timevalue(cflo, prate, base_date=0, utility=None):
@@ -126,7 +361,8 @@ def timevalue(cflo, prate, base_date=0, utility=None):
 
     Args:
         cflo (pandas.Series, list of pandas.Series): Generic cashflow.
-        prate (pandas.Series): Periodic interest rate.
+        prate (pandas.Series, DiscountCurve, PiecewiseRate): Periodic interest
+            rate or discount curve (its period 0 is the first period of ``cflo``).
         base_date (int, tuple): Time.
         utility (function): Utility function.
 
@@ -161,16 +397,35 @@ def timevalue(cflo, prate, base_date=0, utility=None):
     1    103.734935
     dtype: float64
 
+    A discount curve can be used in place of the periodic interest rate:
+
+    >>> curve = DiscountCurve([1, 0.89, 0.80, 0.71, 0.64], freq='Q')
+    >>> timevalue(cflo, curve) # doctest: +ELLIPSIS
+    104.0...
+
+    >>> timevalue(cflo, curve, base_date='2001Q1') # doctest: +ELLIPSIS
+    162.5...
+
+    And also a piecewise constant rate:
+
+    >>> timevalue(cflo, PiecewiseRate(12, periods=5, freq='Q')) # doctest: +ELLIPSIS
+    103.73...
 
     """
 
     if isinstance(cflo, pd.Series):
         cflo = [cflo]
-    if not isinstance(prate, pd.Series):
+    if isinstance(prate, (DiscountCurve, PiecewiseRate)):
+        verify_period_range(cflo)
+        if isinstance(base_date, str):
+            base_date = period2pos(cflo[0].axes[0], pd.Period(base_date, freq=cflo[0].axes[0].freq))
+        factor = prate.discount(np.arange(len(cflo[0]))) / prate.discount(base_date)
+    elif not isinstance(prate, pd.Series):
         raise TypeError("`prate` must be a pandas.Series")
-    verify_period_range(cflo + [prate])
+    else:
+        verify_period_range(cflo + [prate])
+        factor = to_discount_factor(prate=prate, base_date=base_date)
     retval = pd.Series([0] * len(cflo), dtype=np.float64)
-    factor = to_discount_factor(prate=prate, base_date=base_date)
     for index, xcflo in enumerate(cflo):
         netval = 0
         for time, _ in enumerate(xcflo):
@@ -181,18 +436,152 @@ def timevalue(cflo, prate, base_date=0, utility=None):
     return retval
 
 
+def timevalue_profile(cflo, prate, remaining=False):
+    """
+    Computes the equivalent net value of a generic cashflow at every period
+    using the periodic interest rate `prate`. The element of the first period
+    is the net present value and the element of the last period is the
+    equivalent future value.
+
+    Args:
+        cflo (pandas.Series, list of pandas.Series): Generic cashflow.
+        prate (pandas.Series, DiscountCurve, PiecewiseRate): Periodic interest
+            rate or discount curve (its period 0 is the first period of ``cflo``).
+        remaining (bool): When it is ``True``, the value at each period only
+            includes the flows of that period and the following ones (the
+            value of the remaining cashflow).
+
+    Returns:
+        pandas.Series (or pandas.DataFrame with a column for each cashflow).
+
+    The values are computed with the reverse recursion
+    ``V(t) = c(t) + V(t + 1) / (1 + r(t + 1))``, expressed as a reverse
+    cumulative sum of the discounted flows, so all the periods are valued in
+    a single pass over the cashflow instead of a call to ``timevalue`` for
+    each period.
+
+    **Examples.**
+
+    >>> prate = interest_rate([12]*5, start='2000Q1', freq='Q')
+    >>> cflo = cashflow([-200] + [100]*4, start='2000Q1', freq='Q')
+    >>> timevalue_profile(cflo, prate) # doctest: +NORMALIZE_WHITESPACE
+    2000Q1    103.734935
+    2000Q2    116.183127
+    2000Q3    130.125102
+    2000Q4    145.740114
+    2001Q1    163.228928
+    Freq: Q-DEC, dtype: float64
+
+    >>> timevalue_profile(cflo, prate, remaining=True) # doctest: +NORMALIZE_WHITESPACE
+    2000Q1    103.734935
+    2000Q2    340.183127
+    2000Q3    269.005102
+    2000Q4    189.285714
+    2001Q1    100.000000
+    Freq: Q-DEC, dtype: float64
+
+    """
+    if isinstance(cflo, pd.Series):
+        cflo = [cflo]
+        single = True
+    else:
+        single = False
+    if isinstance(prate, (DiscountCurve, PiecewiseRate)):
+        verify_period_range(cflo)
+        log_factor = np.log(prate.discount(np.arange(len(cflo[0]))))
+    elif not isinstance(prate, pd.Series):
+        raise TypeError("`prate` must be a pandas.Series")
+    else:
+        verify_period_range(cflo + [prate])
+        log_factor = -np.cumsum(np.log1p(prate.values / 100))
+    factor = np.exp(log_factor - log_factor[0])
+    values = np.column_stack([xcflo.values for xcflo in cflo]) * factor[:, np.newaxis]
+    if remaining:
+        values = np.cumsum(values[::-1], axis=0)[::-1]
+    else:
+        values = np.broadcast_to(values.sum(axis=0), values.shape)
+    values = values / factor[:, np.newaxis]
+    if single:
+        return pd.Series(values[:, 0], index=cflo[0].index)
+    return pd.DataFrame(values, index=cflo[0].index)
+
+
+def npv_profile(cflo, prate):
+    """
+    Computes the net present value of generic cashflows for a grid of
+    constant periodic interest rates.
+
+    Args:
+        cflo (pandas.Series, list, pandas.DataFrame, numpy.array): Generic
+            cashflow, list of cashflows or matrix with a cashflow in each row.
+        prate (float, list, numpy.array): Grid of periodic interest rates (in
+            percentage).
+
+    Returns:
+        pandas.Series with a value for each rate for a single cashflow, and a
+        matrix with a row for each cashflow and a column for each rate
+        otherwise (``pandas.DataFrame``, or ``numpy.array`` for a 2-D array).
+
+    The net present value is a polynomial in the discount factor
+    ``x = 1 / (1 + r)``. The powers ``x ** t`` of all the rates are built with
+    the recurrence ``x ** t = x ** (t - 1) * x`` and the polynomials of all the
+    cashflows are evaluated at all the rates with one matrix product.
+
+    **Examples.**
+
+    >>> cflo = cashflow([-200] + [100]*4, start='2000Q1', freq='Q')
+    >>> npv_profile(cflo, [0, 12, 34.9]) # doctest: +NORMALIZE_WHITESPACE
+    0.0     200.000000
+    12.0    103.734935
+    34.9      0.010907
+    dtype: float64
+
+    >>> npv_profile(np.array([[-200, 100, 100, 100, 100],
+    ...                       [-100, -100, 150, 150, 0]]), [0, 12])
+    array([[200.        , 103.73493466],
+           [100.        ,  37.06040452]])
+
+    """
+    if isinstance(cflo, pd.Series):
+        cflo = [cflo]
+        single = True
+    else:
+        single = False
+    matrix, _ = _as_matrix(cflo)
+    prate = np.atleast_1d(np.asarray(prate, dtype=np.float64))
+    powers = np.empty((matrix.shape[1], len(prate)))
+    powers[0] = 1
+    factor = 1 / (1 + prate / 100)
+    for time in range(1, matrix.shape[1]):
+        powers[time] = powers[time - 1] * factor
+    values = matrix.dot(powers)
+    if single:
+        return pd.Series(values[0], index=prate)
+    if isinstance(cflo, pd.DataFrame):
+        return pd.DataFrame(values, index=cflo.index, columns=prate)
+    if isinstance(cflo, list):
+        return pd.DataFrame(values, columns=prate)
+    return values
+
+
 def net_uniform_series(cflo, prate, nper=1):
     """Computes a net uniform series equivalent of a cashflow. This is,
     a fixed periodic payment during `nper` periods that is equivalent
     to the cashflow `cflo` at the periodic interest rate `prate`.
 
     Args:
-        cflo (pandas.Series): Generic cashflow.
-        prate (pandas.Series): Periodic interest rate.
-        nper (int, list): Number of equivalent payment periods.
+        cflo (pandas.Series, list, pandas.DataFrame, numpy.array): Generic
+            cashflow, list of cashflows or matrix with a cashflow in each row.
+        prate (pandas.Series, DiscountCurve, PiecewiseRate): Periodic interest rate.
+        nper (int, list, numpy.array): Number of equivalent payment periods.
 
     Returns:
-        Float or list of floats.
+        Float or list of floats. When ``nper`` is a list, a ``numpy.array``
+        with the broadcast of the cashflows and the values of ``nper``.
+
+    The net present values of all the cashflows are computed with one matrix
+    product, and the capital recovery factor of the equivalent periodic rate
+    is applied by broadcasting over ``nper``.
 
     **Examples.**
 
@@ -211,23 +600,32 @@ def net_uniform_series(cflo, prate, nper=1):
     1    116.183127
     dtype: float64
 
+    >>> net_uniform_series(cflo, prate, nper=[1, 2, 4]) # doctest: +ELLIPSIS
+    array([116.18...,  61.37...,  34.15...])
 
+    >>> net_uniform_series(np.array([[-200, 100, 100, 100, 100],
+    ...                              [-100, -100, 150, 150, 0]]), prate, nper=[4, 2]) # doctest: +ELLIPSIS
+    array([34.15..., 21.92...])
 
     """
 
     if isinstance(cflo, pd.Series):
         cflo = [cflo]
-    if not isinstance(prate, pd.Series):
-        raise TypeError("`prate` must be a pandas.Series")
-    verify_period_range(cflo + [prate])
-    retval = pd.Series([0] * len(cflo), dtype=np.float64)
-    erate = equivalent_rate(prate=prate)
-    for index, xcflo in enumerate(cflo):
-        netval = timevalue(cflo=xcflo, prate=prate, base_date=0)
-        retval[index] = -tvmm(nrate=erate, nper=nper, pval=netval, fval=0, pmt=None)
-    if len(retval) == 1:
-        return retval[0]
-    return retval
+    if isinstance(cflo, list) and isinstance(prate, pd.Series):
+        verify_period_range(cflo + [prate])
+    matrix, rebuild = _as_matrix(cflo)
+    factor = _discount_vector(prate, matrix.shape[1])
+    netval = matrix.dot(factor)
+    # equivalent periodic rate of the periods 1, ..., T - 1
+    erate = np.expm1(-np.log(factor[-1]) / (len(factor) - 1))
+    nper = np.asarray(nper, dtype=np.float64)
+    if erate == 0:
+        recovery = 1 / nper
+    else:
+        recovery = erate / -np.expm1(-nper * np.log1p(erate))
+    if nper.ndim == 0:
+        return rebuild(netval * recovery)
+    return netval * recovery
 
 
 def benefit_cost_ratio(cflo, prate, base_date=0):
@@ -236,9 +634,10 @@ def benefit_cost_ratio(cflo, prate, base_date=0):
     using the periodic interest rate `prate`.
 
     Args:
-        prate (float, pandas.Series): Periodic interest rate.
-        cflo (pandas.Series): Generic cashflow.
-        base_date (int, list): Time.
+        prate (pandas.Series, DiscountCurve, PiecewiseRate): Periodic interest rate.
+        cflo (pandas.Series, list, pandas.DataFrame, numpy.array): Generic
+            cashflow, list of cashflows or matrix with a cashflow in each row.
+        base_date (int, string): Time.
 
     Returns:
         Float or list of floats.
@@ -260,31 +659,26 @@ def benefit_cost_ratio(cflo, prate, base_date=0):
     1    1.518675
     dtype: float64
 
+    The benefits and costs of all the cashflows are discounted with a single
+    matrix product:
+
+    >>> benefit_cost_ratio(np.array([[-200, 100, 100, 100, 100],
+    ...                              [-100, -100, 150, 150, 0]]), prate) # doctest: +ELLIPSIS
+    array([1.518..., 1.195...])
+
 
     """
 
     if isinstance(cflo, pd.Series):
         cflo = [cflo]
-    if not isinstance(prate, pd.Series):
-        raise TypeError("`prate` must be a pandas.Series")
-    verify_period_range(cflo + [prate])
-    retval = pd.Series([0] * len(cflo), dtype=np.float64)
-    for index, xcflo in enumerate(cflo):
-        num = 0
-        den = 0
-        num = xcflo.copy()
-        den = xcflo.copy()
-        for time, _ in enumerate(xcflo):
-            if xcflo[time] >= 0.0:
-                den[time] = 0
-            else:
-                num[time] = 0
-        retval[index] = -timevalue(num, prate, base_date) / timevalue(
-            den, prate, base_date
-        )
-    if len(retval) == 1:
-        return retval[0]
-    return retval
+    if isinstance(cflo, list) and isinstance(prate, pd.Series):
+        verify_period_range(cflo + [prate])
+    matrix, rebuild = _as_matrix(cflo)
+    index = cflo[0].axes[0] if isinstance(cflo, list) else None
+    factor = _discount_vector(prate, matrix.shape[1], base_date, index)
+    parts = np.where(matrix >= 0, matrix, 0), np.where(matrix < 0, matrix, 0)
+    benefit, cost = np.stack(parts).dot(factor)
+    return rebuild(-benefit / cost)
 
 
 if __name__ == "__main__":
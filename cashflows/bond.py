@@ -10,6 +10,27 @@ expected cashflow of a bond. Also,it is possible to make a sensibility analysis
 for different values for the yield-to-maturity and one present value of
 the bond.
 
+For large universes of bonds, the function ``bond_ytm`` computes the
+yield-to-maturity of arrays of bonds at once, and the function ``bond_risk``
+computes the price, durations, convexity and DV01 of arrays of bonds in a
+single pass. The function ``bond_scenarios`` values a portfolio of bonds
+under a set of shocks of a discount curve, and the function
+``key_rate_durations`` computes their key rate durations. The function
+``bond_book`` values books of fixed rate bonds, floating rate notes and
+amortizing bonds (see ``sinking_fund``) using the discount factors of a curve.
+
+Price/yield conversions of the same bond can be done using a precomputed
+table (``PriceYieldTable``); the function ``price_yield_table`` builds the
+tables on first use and keeps them in a cache.
+
+Dated bonds are described by their maturity date and the frequency of the
+coupons (``freq``). The function ``coupon_schedule`` builds the coupon dates
+as a ``pandas.PeriodIndex`` and the function ``dated_bond`` computes the
+accrued interest and the clean and dirty prices at a settlement date between
+two coupons. Valid values for ``freq`` are ``'A'`` (annual), ``'6M'``
+(semiannual), ``'Q'`` (quarterly) and ``'M'`` (monthly). Coupon dates are not
+adjusted to business days, so the business day frequencies are not accepted.
+
 
 Functions in this module
 -------------------------------------------------------------------------------
@@ -18,33 +39,70 @@ Functions in this module
 
 """
 
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
 # cashflows.
-from cashflows.tvmm import tvmm
+from cashflows.timeseries import *
+from cashflows.curve import DiscountCurve
+from cashflows.common import getpyr, _vars2list, _expand_bracket, _newton_bisect, _FREQ2PYR
 
 def bond(maturity_date=None, freq='A', face_value=None,
-         coupon_rate=None, coupon_value=None, num_coupons=None, value=None, ytm=None):
+         coupon_rate=None, coupon_value=None, num_coupons=None, value=None, ytm=None,
+         settlement_date=None):
     """
 
     Args:
+        maturity_date (string, datetime, list): maturity date of dated bonds.
+        freq (string, list): frequency of the coupons of dated bonds.
+        settlement_date (string, datetime, list): settlement date of dated bonds.
         face_value (float, list): bond’s value at maturity.
         coupon_value (float):  amount of money you receive periodically as the bond matures.
         num_coupons (int, list): number of coupons before maturity.
-        ytm (float): yield to maturity.
+        ytm (float, DiscountCurve): yield to maturity or discount curve. The
+            coupons are paid at the periods 1, 2, ... of the curve.
         coupon_rate (float, list): rate of the face value that defines the coupon value.
+            With a discount curve, it is a nominal rate per year and the
+            coupon of each period is ``coupon_rate * face_value / 100 / curve.pyr``.
 
     Returns:
         Float or list of floats.
 
+    When ``maturity_date`` is specified, ``num_coupons`` is ignored and the
+    bonds are valued with ``dated_bond`` at ``settlement_date``. In this case,
+    ``face_value`` defaults to 100.
+
     Examples:
 
     >>> bond(face_value=1000, coupon_value=56, num_coupons=10, ytm=5.6) # doctest: +ELLIPSIS
     1000.0...
 
-    >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10, value=1000) # doctest: +ELLIPSIS
-    5.6...
+    >>> round(bond(face_value=1000, coupon_rate=5.6, num_coupons=10, value=1000), 10)
+    5.6
+
+    >>> curve = DiscountCurve([1, 0.95, 0.90, 0.84])
+    >>> bond(face_value=1000, coupon_value=56, num_coupons=3, ytm=curve) # doctest: +ELLIPSIS
+    990.64...
+
+    >>> bond(face_value=1000, coupon_value=56, num_coupons=[1, 2, 3], ytm=curve) # doctest: +NORMALIZE_WHITESPACE
+       Coupon_Rate  Coupon_Value  Face_Value  Num_Coupons    Value
+    0          5.6            56        1000            1  1003.20
+    1          5.6            56        1000            2  1003.60
+    2          5.6            56        1000            3   990.64
+
+    A curve bootstrapped from par bonds prices them back at par:
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[2, 4, 6], coupon_rate=[5, 5.5, 6], freq='6M')
+    >>> round(bond(face_value=100, coupon_rate=5.5, num_coupons=4, ytm=curve), 8)
+    100.0
+
+    >>> bond(maturity_date='2020-06-15', freq='6M', settlement_date='2018-03-01',
+    ...      coupon_rate=6, ytm=6) # doctest: +NORMALIZE_WHITESPACE
+       Accrued_Interest  Clean_Price  Dirty_Price Maturity_Date  Num_Coupons  YTM
+    0          1.252747    99.989226   101.241973    2020-06-15            5  6.0
 
     >>> bond(face_value=[1000, 1200, 1400], coupon_value=56, num_coupons=10, value=1000) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
        Coupon_Rate  Coupon_Value  Face_Value  Num_Coupons  Value      YTM
@@ -122,33 +180,33 @@ def bond(maturity_date=None, freq='A', face_value=None,
     26     4.833333          58.0        1200           10   1000   7.231779
 
     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10, value=1000, ytm=[5.1, 5.6, 6.1]) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
-       Basis_Value        Change  Coupon_Rate  Coupon_Value  Face_Value  \\
-    0         1000  3.842187e+00          5.6          56.0        1000
-    1         1000  1.136868e-14          5.6          56.0        1000
-    2         1000 -3.662671e+00          5.6          56.0        1000
+       Basis_Value    Change  Coupon_Rate  Coupon_Value  Face_Value  Num_Coupons  \\
+    0         1000  3.842187          5.6          56.0        1000           10
+    1         1000  0.000000          5.6          56.0        1000           10
+    2         1000 -3.662671          5.6          56.0        1000           10
     <BLANKLINE>
-       Num_Coupons        Value  YTM
-    0           10  1038.421866  5.1
-    1           10  1000.000000  5.6
-    2           10   963.373290  6.1
+             Value  YTM
+    0  1038.421866  5.1
+    1  1000.000000  5.6
+    2   963.373290  6.1
 
 
     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10, value=[1000, 1100], ytm=[5.1, 5.6, 6.1]) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
-       Basis_Value        Change  Coupon_Rate  Coupon_Value  Face_Value  \\
-    0         1000  3.842187e+00          5.6          56.0        1000
-    1         1000  1.136868e-14          5.6          56.0        1000
-    2         1000 -3.662671e+00          5.6          56.0        1000
-    3         1100 -5.598012e+00          5.6          56.0        1000
-    4         1100 -9.090909e+00          5.6          56.0        1000
-    5         1100 -1.242061e+01          5.6          56.0        1000
+       Basis_Value     Change  Coupon_Rate  Coupon_Value  Face_Value  Num_Coupons  \\
+    0         1000   3.842187          5.6          56.0        1000           10
+    1         1000   0.000000          5.6          56.0        1000           10
+    2         1000  -3.662671          5.6          56.0        1000           10
+    3         1100  -5.598012          5.6          56.0        1000           10
+    4         1100  -9.090909          5.6          56.0        1000           10
+    5         1100 -12.420610          5.6          56.0        1000           10
     <BLANKLINE>
-       Num_Coupons        Value  YTM
-    0           10  1038.421866  5.1
-    1           10  1000.000000  5.6
-    2           10   963.373290  6.1
-    3           10  1038.421866  5.1
-    4           10  1000.000000  5.6
-    5           10   963.373290  6.1
+             Value  YTM
+    0  1038.421866  5.1
+    1  1000.000000  5.6
+    2   963.373290  6.1
+    3  1038.421866  5.1
+    4  1000.000000  5.6
+    5   963.373290  6.1
 
 
 
@@ -172,13 +230,22 @@ def bond(maturity_date=None, freq='A', face_value=None,
     if coupon_rate is None and coupon_value is None:
         raise ValueError('coupon_rate or coupon_value must be specified')
 
+    if maturity_date is not None:
+        if settlement_date is None:
+            raise ValueError('settlement_date must be specified for dated bonds')
+        if face_value is None:
+            face_value = 100
+        return dated_bond(settlement_date=settlement_date, maturity_date=maturity_date,
+                          freq=freq, face_value=face_value, coupon_rate=coupon_rate,
+                          coupon_value=coupon_value, ytm=ytm, value=value)
+
     ## converts params to lists
 
     if coupon_rate is not None and not isinstance(coupon_rate, list):
-            coupon_rate = [coupon_rate]
+        coupon_rate = [coupon_rate]
 
     if coupon_value is not None and not isinstance(coupon_value, list):
-            coupon_value = [coupon_value]
+        coupon_value = [coupon_value]
 
     if not isinstance(num_coupons, list):
         num_coupons = [num_coupons]
@@ -186,276 +253,996 @@ def bond(maturity_date=None, freq='A', face_value=None,
     if not isinstance(face_value, list):
         face_value = [face_value]
 
-    if not isinstance(num_coupons, list):
-        num_coupons = [num_coupons]
-
-    if ytm is not None and not isinstance(ytm, list):
+    if ytm is not None and not isinstance(ytm, (list, DiscountCurve)):
         ytm = [ytm]
 
     if value is not None and not isinstance(value, list):
         value = [value]
 
-    result = None
-    counter = 0
+    if isinstance(ytm, DiscountCurve):
+        if value is not None:
+            raise ValueError('value must be None when ytm is a discount curve')
+        if coupon_value is None:
+            coupon_value = [xrate * face_value[0] / 100 / ytm.pyr for xrate in coupon_rate]
+        xface_value, xcoupon_value, xnum_coupons = _grid(face_value, coupon_value, num_coupons)
+        annuity = np.cumsum(ytm.discount(np.arange(1, np.max(xnum_coupons) + 1)))
+        xvalue = (xcoupon_value * annuity[xnum_coupons.astype(int) - 1] +
+                  xface_value * ytm.discount(xnum_coupons))
+        if len(xvalue) == 1:
+            return xvalue[0].item()
+        return pd.DataFrame({'Coupon_Rate': xcoupon_value / xface_value * 100.0 * ytm.pyr,
+                             'Coupon_Value': xcoupon_value,
+                             'Face_Value': xface_value,
+                             'Num_Coupons': xnum_coupons,
+                             'Value': xvalue},
+                            columns=['Coupon_Rate', 'Coupon_Value', 'Face_Value',
+                                     'Num_Coupons', 'Value'])
+
+    ## value or ytm is unknown: the coupon values are computed
+    ## using the first face value
+    if value is None or ytm is None:
+
+        if coupon_value is None:
+            coupon_value = [xrate * face_value[0] / 100 for xrate in coupon_rate]
+
+        xface_value, xcoupon_value, xnum_coupons, xparam = _grid(face_value,
+                                                                 coupon_value,
+                                                                 num_coupons,
+                                                                 ytm if value is None else value)
+        xcoupon_rate = xcoupon_value / xface_value * 100.0
+
+        if value is None:
+            xytm = xparam
+            xvalue = _bond_value(xytm, xface_value, xcoupon_value, xnum_coupons)
+            result = xvalue
+        else:
+            xvalue = xparam
+            xytm, _ = bond_ytm(value=xvalue, face_value=xface_value, num_coupons=xnum_coupons,
+                               coupon_value=xcoupon_value)
+            result = xytm
+
+        if len(result) == 1:
+            return result[0].item()
+
+        return pd.DataFrame({'Coupon_Rate': xcoupon_rate,
+                             'Coupon_Value': xcoupon_value,
+                             'Face_Value': xface_value,
+                             'Num_Coupons': xnum_coupons,
+                             'Value': xvalue,
+                             'YTM': xytm},
+                            columns=['Coupon_Rate', 'Coupon_Value', 'Face_Value',
+                                     'Num_Coupons', 'Value', 'YTM'])
 
-    ## value is unknown
-    if value is None:
+    #
+    # value and ytm are not None
+    # sensibility analysis
+    #
+    # when coupon_rate is specified, the coupon values are computed for
+    # each face value
+    #
 
-        for xface_value in face_value:
+    xface_value = np.asarray(face_value)
+    if coupon_rate is not None:
+        coupons = np.multiply.outer(xface_value, np.asarray(coupon_rate)) / 100
+    else:
+        coupons = np.tile(np.asarray(coupon_value), (len(face_value), 1))
+
+    basis_value, iface, icoupon, xnum_coupons, xytm = _grid(value,
+                                                            range(coupons.shape[0]),
+                                                            range(coupons.shape[1]),
+                                                            num_coupons,
+                                                            ytm)
+    xface_value = xface_value[iface]
+    xcoupon_value = coupons[iface, icoupon]
+
+    xcoupon_rate = xcoupon_value / xface_value * 100.0
+    xvalue = _bond_value(xytm, xface_value, xcoupon_value, xnum_coupons)
+
+    return pd.DataFrame({'Basis_Value': basis_value,
+                         'Change': 100 * (xvalue - basis_value) / basis_value,
+                         'Coupon_Rate': xcoupon_rate,
+                         'Coupon_Value': xcoupon_value,
+                         'Face_Value': xface_value,
+                         'Num_Coupons': xnum_coupons,
+                         'Value': xvalue,
+                         'YTM': xytm},
+                        columns=['Basis_Value', 'Change', 'Coupon_Rate', 'Coupon_Value',
+                                 'Face_Value', 'Num_Coupons', 'Value', 'YTM'])
+
+
+def _bond_sums(yld, nper):
+    """Returns the sums ``sum(v ** k)``, ``sum(k * v ** k)`` and
+    ``sum(k ** 2 * v ** k)`` for ``k = 1, ..., nper`` and the discount factor
+    ``v ** nper``, where ``v = 1 / (1 + yld)``.
+
+    The sums are computed in closed form using the recurrences
+    ``y * v * s1 = s0 - n * v ** (n + 1)`` and
+    ``y * v * s2 = 2 * s1 - s0 - n ** 2 * v ** (n + 1)``. When ``n * y`` is
+    close to zero, a second order expansion in ``log(1 + y)`` is used instead.
+    """
+    yld, nper = np.broadcast_arrays(np.asarray(yld, dtype=np.float64),
+                                    np.asarray(nper, dtype=np.float64))
+    logv = -np.log1p(yld)
+    vnper = np.exp(nper * logv)
+    vnext = vnper * np.exp(logv)
+    small = np.abs(nper * yld) < 1e-4
+    safe = np.where(small, 1.0, yld)
+
+    sum0 = np.where(small, nper, -np.expm1(nper * logv) / safe)
+    sum1 = (sum0 - nper * vnext) / (safe * np.exp(logv))
+    sum2 = (2 * sum1 - sum0 - nper ** 2 * vnext) / (safe * np.exp(logv))
+
+    # power sums of k, k^2, k^3 and k^4 for the expansion near zero
+    pow1 = nper * (nper + 1) / 2
+    pow2 = nper * (nper + 1) * (2 * nper + 1) / 6
+    pow3 = pow1 ** 2
+    pow4 = pow2 * (3 * nper ** 2 + 3 * nper - 1) / 5
+    pow0 = nper
+    sum0 = np.where(small, pow0 + logv * pow1 + logv ** 2 / 2 * pow2, sum0)
+    sum1 = np.where(small, pow1 + logv * pow2 + logv ** 2 / 2 * pow3, sum1)
+    sum2 = np.where(small, pow2 + logv * pow3 + logv ** 2 / 2 * pow4, sum2)
+    return sum0, sum1, sum2, vnper
+
+
+def _coupon_per_period(face_value, coupon_rate, coupon_value, pyr):
+    """Coupon paid in each period (``coupon_rate`` is a nominal rate per year)."""
+    if coupon_rate is None and coupon_value is None:
+        raise ValueError('coupon_rate or coupon_value must be specified')
+    if coupon_value is None:
+        return np.asarray(coupon_rate, dtype=np.float64) * face_value / 100 / pyr
+    return np.asarray(coupon_value, dtype=np.float64)
 
-            if coupon_value is None:
-                coupon_value = [xrate * xface_value / 100 for xrate in coupon_rate]
 
-            for xcoupon_value in coupon_value:
-                for xnum_coupons in num_coupons:
-                    for xytm in ytm:
+def bond_ytm(value, face_value, num_coupons, coupon_rate=None, coupon_value=None,
+             pyr=1, tol=1e-10, maxiter=50):
+    """Computes the yield-to-maturity of arrays of bonds.
 
-                        xvalue = tvmm(pmt=xcoupon_value,
-                                      fval=xface_value,
-                                      nper=xnum_coupons,
-                                      nrate=xytm,
-                                      due=0, pyr=1)
+    Args:
+        value (float, list, numpy.array): price of the bonds.
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity.
+            Bonds without coupons get the status ``2``.
+        coupon_rate (float, list, numpy.array): nominal rate per year of the
+            face value that defines the coupon value.
+        coupon_value (float, list, numpy.array): amount of money received in
+            each period.
+        pyr (int, list, numpy.array): number of coupons per year.
+        tol (float): tolerance for the periodic yield.
+        maxiter (int): maximum number of iterations.
 
-                        xcoupon_rate = xcoupon_value / xface_value * 100.0
+    Returns:
+        A tuple ``(ytm, status)`` of numpy arrays, where ``ytm`` is the
+        nominal yield-to-maturity per year (in percentage) and ``status``
+        is ``0`` for converged bonds, ``1`` when ``maxiter`` was reached and
+        ``2`` when the price can not be matched by any yield or
+        ``num_coupons`` is less than one (``ytm`` is ``nan``).
+
+    **Details**
+
+    All the arguments are broadcast against each other, and the equation
+    ``value = coupon * a(y) + face_value * v(y) ** num_coupons`` is solved for
+    the periodic yield ``y`` of all the bonds at once. The starting values
+    are given by the classical approximation
+    ``y = (coupon + (face_value - value) / num_coupons) / ((face_value + value) / 2)``
+    and refined with a Newton-Raphson method (with the analytical derivative
+    of the price) safeguarded by bisection. Usually, all the bonds converge
+    in a handful of array iterations.
+
+    **Examples**
+
+    >>> ytm, status = bond_ytm(value=[800, 900, 1000], face_value=1000,
+    ...                        num_coupons=10, coupon_value=56)
+    >>> ytm # doctest: +ELLIPSIS
+    array([8.671..., 7.025..., 5.6...])
+    >>> status
+    array([0, 0, 0])
+
+    Semiannual bonds:
+
+    >>> bond_ytm(value=[950, 1050], face_value=1000, num_coupons=20,
+    ...          coupon_rate=6, pyr=2) # doctest: +ELLIPSIS
+    (array([6.69..., 5.34...]), array([0, 0]))
+
+    Prices that can not be matched by any yield are flagged:
+
+    >>> bond_ytm(value=[1000, -10], face_value=1000, num_coupons=10,
+    ...          coupon_rate=5.6) # doctest: +ELLIPSIS
+    (array([5.6..., nan]), array([0, 2]))
+    >>> bond_ytm(value=1000, face_value=1000, num_coupons=[10, 0],
+    ...          coupon_rate=5.6) # doctest: +ELLIPSIS
+    (array([5.6..., nan]), array([0, 2]))
 
-                        aux = pd.DataFrame({'Face_Value': xface_value,
-                                            'Coupon_Value': xcoupon_value,
-                                            'Coupon_Rate': xcoupon_rate,
-                                            'Num_Coupons':xnum_coupons,
-                                            'YTM':xytm,
-                                            'Value': -xvalue},
-                                            index = [counter])
-                        counter += 1
+    """
+    #pylint: disable=too-many-arguments
+
+    value = np.asarray(value, dtype=np.float64)
+    face_value = np.asarray(face_value, dtype=np.float64)
+    num_coupons = np.asarray(num_coupons, dtype=np.float64)
+    pyr = np.asarray(pyr, dtype=np.float64)
+    coupon = _coupon_per_period(face_value, coupon_rate, coupon_value, pyr)
+    value, face_value, num_coupons, coupon, pyr = np.broadcast_arrays(value,
+                                                                      face_value,
+                                                                      num_coupons,
+                                                                      coupon,
+                                                                      pyr)
+
+    # bonds without coupons are solved as one coupon bonds and flagged later
+    invalid = num_coupons < 1
+    num_coupons = np.where(invalid, 1, num_coupons)
+
+    def fun(yld):
+        sum0, _, _, vnper = _bond_sums(yld, num_coupons)
+        return coupon * sum0 + face_value * vnper - value
+
+    def dfun(yld):
+        _, sum1, _, vnper = _bond_sums(yld, num_coupons)
+        return -(coupon * sum1 + face_value * num_coupons * vnper) / (1 + yld)
+
+    guess = (coupon + (face_value - value) / num_coupons) / ((face_value + value) / 2)
+
+    # the price decreases with the yield: the lower end of the bracket is
+    # moved towards -1 until the price is greater than value
+    lower = np.clip(np.minimum(guess, 0) - 0.05, -0.95, None)
+    for _ in range(10):
+        below = fun(lower) < 0
+        if not below.any():
+            break
+        lower = np.where(below, (lower - 1) / 2, lower)
+    lower, upper = _expand_bracket(fun, lower, np.maximum(2 * np.abs(guess), 0.1))
+    yld, status = _newton_bisect(fun, guess, lower, upper, dfun=dfun,
+                                 tol=tol, maxiter=maxiter)
+    status = np.where(invalid, 2, status)
+    return np.where(invalid, np.nan, 100 * pyr * yld), status
+
+
+def bond_risk(face_value, num_coupons, ytm=None, value=None, coupon_rate=None,
+              coupon_value=None, pyr=1):
+    """Computes the price and the risk measures of arrays of bonds.
 
-                        if result is None:
-                            result = aux
-                        else:
-                            result = result.append(aux, ignore_index=True)
+    Args:
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity.
+        ytm (float, list, numpy.array): nominal yield-to-maturity per year (in
+            percentage).
+        value (float, list, numpy.array): price of the bonds. It is used to
+            compute the yield-to-maturity when ``ytm`` is ``None``.
+        coupon_rate (float, list, numpy.array): nominal rate per year of the
+            face value that defines the coupon value.
+        coupon_value (float, list, numpy.array): amount of money received in
+            each period.
+        pyr (int, list, numpy.array): number of coupons per year.
 
+    Returns:
+        A pandas.DataFrame with one row per bond.
 
-        if len(result) == 1:
-            return np.asscalar(result['Value'])
-        return result
+    **Details**
+
+    The price and its first two derivatives with respect to the yield are
+    computed in closed form in a single pass over the arrays. Durations are
+    measured in years and the convexity in years squared:
+
+    * ``Macaulay_Duration``: weighted average time of the cashflows.
+
+    * ``Modified_Duration``: ``Macaulay_Duration / (1 + ytm / 100 / pyr)``.
+
+    * ``Convexity``: second derivative of the price with respect to the yield
+      divided by the price.
+
+    * ``DV01``: change of the price for a decrease of one basis point in the
+      yield (``Modified_Duration * Value / 10000``).
+
+    **Examples**
+
+    >>> bond_risk(face_value=1000, num_coupons=[5, 10, 30], ytm=5.6,
+    ...           coupon_rate=5.6) # doctest: +NORMALIZE_WHITESPACE
+        Convexity      DV01  Macaulay_Duration  Modified_Duration   Value  YTM
+    0   23.318766  0.425860           4.497081           4.258600  1000.0  5.6
+    1   71.786683  0.750160           7.921692           7.501602  1000.0  5.6
+    2  315.508334  1.437462          15.179595          14.374616  1000.0  5.6
+
+    Semiannual bonds priced from their market value:
+
+    >>> bond_risk(face_value=1000, num_coupons=20, value=[950, 1050],
+    ...           coupon_rate=6, pyr=2) # doctest: +NORMALIZE_WHITESPACE
+       Convexity      DV01  Macaulay_Duration  Modified_Duration   Value       YTM
+    0  67.477231  0.697792           7.591016           7.345177   950.0  6.693902
+    1  69.996665  0.790240           7.727344           7.526098  1050.0  5.347940
+
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
 
-    ## ytm is unknown
     if ytm is None:
+        if value is None:
+            raise ValueError('ytm or value must be specified')
+        ytm, _ = bond_ytm(value=value, face_value=face_value, num_coupons=num_coupons,
+                          coupon_rate=coupon_rate, coupon_value=coupon_value, pyr=pyr)
+
+    face_value = np.asarray(face_value, dtype=np.float64)
+    num_coupons = np.asarray(num_coupons, dtype=np.float64)
+    pyr = np.asarray(pyr, dtype=np.float64)
+    ytm = np.asarray(ytm, dtype=np.float64)
+    coupon = _coupon_per_period(face_value, coupon_rate, coupon_value, pyr)
+    face_value, num_coupons, coupon, pyr, ytm = np.broadcast_arrays(face_value,
+                                                                    num_coupons,
+                                                                    coupon,
+                                                                    pyr,
+                                                                    ytm)
+    yld = ytm / 100 / pyr
+    sum0, sum1, sum2, vnper = _bond_sums(yld, num_coupons)
+
+    price = coupon * sum0 + face_value * vnper
+    first = coupon * sum1 + face_value * num_coupons * vnper
+    second = coupon * (sum2 + sum1) + face_value * num_coupons * (num_coupons + 1) * vnper
+
+    macaulay = first / price / pyr
+    modified = macaulay / (1 + yld)
+    convexity = second / price / (1 + yld) ** 2 / pyr ** 2
+
+    return pd.DataFrame({'Convexity': convexity.ravel(),
+                         'DV01': (modified * price / 10000).ravel(),
+                         'Macaulay_Duration': macaulay.ravel(),
+                         'Modified_Duration': modified.ravel(),
+                         'Value': price.ravel(),
+                         'YTM': ytm.ravel()},
+                        columns=['Convexity', 'DV01', 'Macaulay_Duration',
+                                 'Modified_Duration', 'Value', 'YTM'])
+
+
+class PriceYieldTable:
+    """Precomputed price/yield table of a bond.
 
-        for xface_value in face_value:
+    Args:
+        face_value (float): bond's value at maturity.
+        num_coupons (int): number of coupons before maturity.
+        coupon_rate (float): nominal rate per year of the face value that
+            defines the coupon value.
+        coupon_value (float): amount of money received in each period.
+        pyr (int): number of coupons per year.
+        ytm_range (tuple): minimum and maximum nominal yield-to-maturity per
+            year of the table (in percentage).
+        tol (float): maximum interpolation error of the prices.
+
+    **Details**
+
+    The table stores the price and its derivative with respect to the yield
+    at equally spaced yields. Prices are interpolated with cubic Hermite
+    polynomials, and the yield of a price is computed by inverting the
+    polynomial of the cell that contains the price. The number of nodes is
+    doubled until the bound ``h ** 4 / 384 * M4`` of the interpolation error
+    is lower than ``tol``, where ``h`` is the width of the cells and ``M4`` is
+    the maximum of the fourth derivative of the price. This derivative is
+    positive and decreasing in the yield, so its maximum in each cell is
+    attained at the lower end. The bound of the error of the yields is the
+    bound of the error of the prices divided by the minimum of the absolute
+    value of the derivative of the price. The table is monotone: the slopes
+    of the nodes are checked with the Fritsch-Carlson condition.
+
+    **Examples**
+
+    >>> table = PriceYieldTable(face_value=1000, num_coupons=10, coupon_rate=5.6)
+    >>> table.price([5.6, 7.02545]) # doctest: +ELLIPSIS
+    array([1000.  ...,  900.00...])
+
+    >>> table.ytm([800, 900, 1000]) # doctest: +ELLIPSIS
+    array([8.671..., 7.025..., 5.6...])
+
+    >>> table.error_bound <= 1e-8
+    True
 
-            if coupon_value is None:
-                coupon_value = [xrate * xface_value / 100 for xrate in coupon_rate]
+    """
+    #pylint: disable=too-many-instance-attributes
+
+    def __init__(self, face_value, num_coupons, coupon_rate=None, coupon_value=None,
+                 pyr=1, ytm_range=(0, 20), tol=1e-8):
+        #pylint: disable=too-many-arguments,too-many-locals
+        self.pyr = pyr
+        self.lower = ytm_range[0] / 100 / pyr
+        self.upper = ytm_range[1] / 100 / pyr
+        if self.lower <= -1 or self.upper <= self.lower:
+            raise ValueError('Invalid ytm_range: ' + ytm_range.__repr__())
+        coupon = float(_coupon_per_period(face_value, coupon_rate, coupon_value, pyr))
+        periods = np.arange(1, int(num_coupons) + 1, dtype=np.float64)
+        cflo = np.full(len(periods), coupon)
+        cflo[-1] += face_value
+        self._coupon = coupon
+        self._face_value = float(face_value)
+        self._num_coupons = float(num_coupons)
+
+        npoints = 16
+        while True:
+            yld = np.linspace(self.lower, self.upper, npoints + 1)
+            width = yld[1] - yld[0]
+            value, slope = self._exact(yld)
+            # fourth derivative of the price at the lower end of each cell
+            weights = periods * (periods + 1) * (periods + 2) * (periods + 3) * cflo
+            fourth = np.exp(-np.multiply.outer(np.log1p(yld[:-1]), periods + 4)).dot(weights)
+            error = width ** 4 / 384 * np.max(fourth)
+            secant = np.diff(value) / width
+            alpha, beta = slope[:-1] / secant, slope[1:] / secant
+            if error <= tol and np.all(alpha ** 2 + beta ** 2 <= 9) or npoints > 2 ** 20:
+                break
+            npoints *= 2
+
+        self.yld = yld
+        self.width = width
+        self.value = value
+        self.slope = slope
+        self._increasing = value[::-1].copy()
+        self.error_bound = error
+        self.ytm_error_bound = 100 * pyr * error / np.min(np.abs(slope))
+
+    def _exact(self, yld):
+        """Exact prices and derivatives of the price at the periodic yields ``yld``."""
+        sum0, sum1, _, vnper = _bond_sums(yld, self._num_coupons)
+        value = self._coupon * sum0 + self._face_value * vnper
+        slope = -(self._coupon * sum1 + self._face_value * self._num_coupons * vnper) / (1 + yld)
+        return value, slope
+
+    def _hermite(self, pos, time):
+        """Hermite polynomial of the cell ``pos`` at the relative position ``time``."""
+        time2, time3 = time * time, time * time * time
+        return ((2 * time3 - 3 * time2 + 1) * self.value[pos] +
+                (time3 - 2 * time2 + time) * self.width * self.slope[pos] +
+                (-2 * time3 + 3 * time2) * self.value[pos + 1] +
+                (time3 - time2) * self.width * self.slope[pos + 1])
+
+    def price(self, ytm):
+        """Prices of the bond for the nominal yields-to-maturity ``ytm``.
+
+        Args:
+            ytm (float, list, numpy.array): nominal yield-to-maturity per year.
+
+        Returns:
+            Float or numpy.array.
+        """
+        yld = np.asarray(ytm, dtype=np.float64) / 100 / self.pyr
+        if np.any(yld < self.lower) or np.any(yld > self.upper):
+            raise ValueError('Value of `ytm` out of the range of the table')
+        pos = np.clip(((yld - self.lower) / self.width).astype(np.int64), 0, len(self.yld) - 2)
+        return self._hermite(pos, (yld - self.yld[pos]) / self.width)
+
+    def ytm(self, value):
+        """Nominal yields-to-maturity per year of the bond for the prices ``value``.
+
+        Args:
+            value (float, list, numpy.array): price of the bond.
+
+        Returns:
+            Float or numpy.array.
+        """
+        value = np.asarray(value, dtype=np.float64)
+        if np.any(value > self.value[0]) or np.any(value < self.value[-1]):
+            raise ValueError('Value of `value` out of the range of the table')
+        # prices are decreasing in the yield
+        pos = len(self.value) - 1 - np.searchsorted(self._increasing, value, side='left')
+        pos = np.clip(pos, 0, len(self.yld) - 2)
+        time = (value - self.value[pos]) / (self.value[pos + 1] - self.value[pos])
+        for _ in range(3):
+            time2 = time * time
+            dhermite = ((6 * time2 - 6 * time) * (self.value[pos] - self.value[pos + 1]) +
+                        (3 * time2 - 4 * time + 1) * self.width * self.slope[pos] +
+                        (3 * time2 - 2 * time) * self.width * self.slope[pos + 1])
+            time = np.clip(time - (self._hermite(pos, time) - value) / dhermite, 0, 1)
+        return 100 * self.pyr * (self.yld[pos] + time * self.width)
+
+
+@lru_cache(maxsize=512)
+def price_yield_table(face_value, num_coupons, coupon_rate=None, coupon_value=None, pyr=1):
+    """Returns the price/yield table of a bond. Tables are built on first use
+    and kept in a cache of bounded size.
 
-            for xcoupon_value in coupon_value:
-                for xnum_coupons in num_coupons:
-                    for xvalue in value:
+    Args:
+        face_value (float): bond's value at maturity.
+        num_coupons (int): number of coupons before maturity.
+        coupon_rate (float): nominal rate per year of the face value that
+            defines the coupon value.
+        coupon_value (float): amount of money received in each period.
+        pyr (int): number of coupons per year.
 
-                        xytm = tvmm(pmt=xcoupon_value,
-                                     fval=xface_value,
-                                     nper=xnum_coupons,
-                                     pval=-xvalue,
-                                     due=0, pyr=1)
+    Returns:
+        A object of the class ``PriceYieldTable``.
 
-                        xcoupon_rate = xcoupon_value / xface_value * 100.0
+    **Examples**
 
-                        aux = pd.DataFrame({'Face_Value': xface_value,
-                                            'Coupon_Value': xcoupon_value,
-                                            'Coupon_Rate': xcoupon_rate,
-                                            'Num_Coupons':xnum_coupons,
-                                            'YTM':xytm,
-                                            'Value': xvalue},
-                                            index = [counter])
+    >>> price_yield_table(1000, 10, coupon_rate=5.6).ytm(900) # doctest: +ELLIPSIS
+    7.025...
 
-                        counter += 1
+    >>> price_yield_table(1000, 10, coupon_rate=5.6) is price_yield_table(1000, 10, coupon_rate=5.6)
+    True
 
-                        if result is None:
-                            result = aux
-                        else:
-                            result = result.append(aux, ignore_index=True)
+    """
+    return PriceYieldTable(face_value=face_value, num_coupons=num_coupons,
+                           coupon_rate=coupon_rate, coupon_value=coupon_value, pyr=pyr)
 
-        if len(result) == 1:
-            return np.asscalar(result['YTM'])
-        return result
 
+def _cashflow_matrix(face_value, coupon, num_coupons, nper):
+    """Cashflows of the bonds (rows) at the periods ``1, ..., nper`` (columns)."""
+    periods = np.arange(1, nper + 1)
+    num_coupons = num_coupons.astype(np.int64)[:, np.newaxis]
+    cflo = np.where(periods <= num_coupons, coupon[:, np.newaxis], 0.0)
+    cflo += np.where(periods == num_coupons, face_value[:, np.newaxis], 0.0)
+    return cflo
 
 
-    #
-    # value and ytm are not None
-    # sensibility analysis
-    #
+def bond_scenarios(curve, shocks, face_value, num_coupons, coupon_rate=None,
+                   coupon_value=None):
+    """Values a portfolio of bonds under shocked discount curves.
+
+    Args:
+        curve (DiscountCurve): base discount curve. The coupons are paid at the
+            periods 1, 2, ... of the curve.
+        shocks (list, numpy.array): changes of the nominal zero rates per year
+            (in percentage points) with shape ``(S, T)``: one row per scenario
+            and one column per period ``1, ..., T``. A one dimensional array
+            of length ``S`` is a set of parallel shifts.
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity.
+        coupon_rate (float, list, numpy.array): nominal rate per year of the
+            face value that defines the coupon value (the coupon of each period
+            is ``coupon_rate * face_value / 100 / curve.pyr``).
+        coupon_value (float, list, numpy.array): amount of money received in
+            each period.
+
+    Returns:
+        A tuple ``(values, pnl)`` of pandas.DataFrame with one row per scenario
+        and one column per bond: the values of the bonds and the change of the
+        value with respect to the base curve.
+
+    **Details**
+
+    The discount factors of all the scenarios are stored in a ``(S, T)``
+    matrix and the cashflows of all the bonds in a ``(B, T)`` matrix, so all
+    the bonds are valued under all the scenarios with a single matrix
+    product.
+
+    **Examples**
+
+    >>> curve = DiscountCurve([1, 0.95, 0.90, 0.84])
+    >>> values, pnl = bond_scenarios(curve, shocks=[-1, 0, 1], face_value=1000,
+    ...                              num_coupons=[1, 2, 3], coupon_value=56)
+    >>> values.round(2) # doctest: +NORMALIZE_WHITESPACE
+             0        1        2
+    0  1012.82  1022.40  1017.71
+    1  1003.20  1003.60   990.64
+    2   993.76   985.32   964.55
+    >>> pnl.round(2) # doctest: +NORMALIZE_WHITESPACE
+          0      1      2
+    0  9.62  18.80  27.07
+    1  0.00   0.00   0.00
+    2 -9.44 -18.28 -26.09
+
+    A twist of the curve around the second period:
+
+    >>> values, pnl = bond_scenarios(curve, shocks=[[-0.5, 0, 0.5]], face_value=1000,
+    ...                              num_coupons=[1, 2, 3], coupon_value=56)
+    >>> pnl.round(2) # doctest: +NORMALIZE_WHITESPACE
+          0     1      2
+    0  4.79  0.25 -12.18
+
+    Coupon rates are nominal rates per year, as in ``bootstrap``: a par bond of
+    a semiannual curve is valued at par.
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[2, 4, 6], coupon_rate=[5, 5.5, 6], freq='6M')
+    >>> values, _ = bond_scenarios(curve, shocks=[0], face_value=100,
+    ...                            num_coupons=4, coupon_rate=5.5)
+    >>> values.round(6) # doctest: +NORMALIZE_WHITESPACE
+           0
+    0  100.0
 
-    for basis_value in value:
-
-        for xface_value in face_value:
-
-            if coupon_value is None or coupon_rate is not None:
-                coupon_value = [xrate * xface_value / 100 for xrate in coupon_rate]
-
-            for xcoupon_value in coupon_value:
-                for xnum_coupons in num_coupons:
-                    for xytm in ytm:
-
-                        xvalue = tvmm(pmt=xcoupon_value,
-                                      fval=xface_value,
-                                      nper=xnum_coupons,
-                                      nrate=xytm,
-                                      due=0, pyr=1)
-
-                        xcoupon_rate = xcoupon_value / xface_value * 100.0
-
-                        aux = pd.DataFrame({'Coupon_Value': xcoupon_value,
-                                            'Coupon_Rate': xcoupon_rate,
-                                            'Face_Value': xface_value,
-                                            'Num_Coupons':xnum_coupons,
-                                            'Basis_Value': basis_value,
-                                            'YTM':xytm,
-                                            'Value': -xvalue,
-                                            'Change': 100 * (-xvalue-basis_value)/basis_value},
-                                            index = [counter])
-
-                        counter += 1
-
-                        if result is None:
-                            result = aux
-                        else:
-                            result = result.append(aux, ignore_index=True)
-
-
-    return result
-
-
-
-
-
-
-
-
-
-
-# def bond(face_value=None, coupon_rate=None, coupon_value=None, num_coupons=None,
-#          value=None, ytm=None):
-#     """
-#
-#     Evaluation of bond investments.
-#
-#     Args:
-#        face_value (float): the bond's value-at-maturity.
-#        coupon_rate (float): rate for calculate the coupon payment.
-#        coupon_value (float): periodic payment.
-#        num_coupons (int): number of couont payments before maturity.
-#        value (float, list): present value of the bond
-#        ytm (float, list): yield-to-maturity.
-#
-#
-#     Returns:
-#         None, a float value, or a list of float values:
-#         * `value`: when `ytm` is specified.
-#         * `ytm`:  when `value` is specified.
-#         * `None`: when `ytm` and `value` are specified. Prints a sensibility table.
-#
-#     When `coupon_rate` is defined, `coupon_value` is calculated automaticly.
-#
-#
-#     Examples:
-#
-#     >>> bond(face_value=1000, coupon_value=56, num_coupons=10, ytm=5.6) # doctest: +ELLIPSIS
-#     1000.0...
-#
-#     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10, value=1000) # doctest: +ELLIPSIS
-#     5.6...
-#
-#
-#     Also, it is possible to make sensibility analysis for bond's data. In the
-#     following case, the present value of the bond is calculated for various
-#     values of the yield-to-maturity.
-#
-#     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10,
-#     ... ytm=[4.0, 5.0, 5.6, 6.0, 7.0]) # doctest: +ELLIPSIS
-#     [1129.77..., 1046.33..., 1000.0..., 970.55..., 901.66...]
-#
-#
-#     And for different values:
-#
-#     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10,
-#     ... value=[900, 1000, 1100]) # doctest: +ELLIPSIS
-#     [7.0..., 5.6..., 4.3...]
-#
-#     When values for the yield-to-maturity and one value for present value of
-#     the bond are supplied, the function prints a report.
-#
-#     >>> bond(face_value=1000, coupon_rate=5.6, num_coupons=10,
-#     ... ytm=[4.0, 5.0, 5.6, 6.0, 7.0], value=1000) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
-#     Bond valuation analysis
-#     Reference price: 1000
-#     Analysis:
-#               Yield     Value Change
-#                 (%)       ($)    (%)
-#              ------------------------
-#                4.00   1129.77  12.98
-#                5.00   1046.33   4.63
-#                5.60   1000.00   0.00
-#                6.00    970.56  -2.94
-#                7.00    901.67  -9.83
-#
-#
-#     """
-#
-#
-#     if coupon_rate is None and coupon_value is None:
-#         raise ValueError('coupon_rate or coupon_value must be specified')
-#
-#     if coupon_rate is None:
-#         coupon_rate = coupon_value / face_value
-#
-#     if coupon_value is None:
-#         coupon_value = coupon_rate * face_value / 100
-#
-#     if value is None:
-#         value = tvmm(pmt=coupon_value, fval=face_value,
-#                      nper=num_coupons, nrate=ytm, due=0, pyr=1)
-#         if isinstance(value, list):
-#             value = [-x for x in value]
-#         else:
-#             value = -value
-#         return value
-#
-#     if ytm is None:
-#         if isinstance(value, list):
-#             value = [-x for x in value]
-#         else:
-#             value = -value
-#         return tvmm(pmt=coupon_value, fval=face_value, pval=value, nper=num_coupons, pyr=1)
-#
-#     #
-#     # value and ytm are not None
-#     # sensibility analysis
-#     #
-#
-#     values = tvmm(pmt=coupon_value, fval=face_value,
-#                   nper=num_coupons, nrate=ytm, due=0, pyr=1)
-#     if isinstance(values, list):
-#         values = [-x for x in values]
-#     else:
-#         values = -values
-#
-#     txt = ['Bond valuation analysis']
-#     txt += ['Reference price: ' + value.__str__()]
-#     txt += ['Analysis:']
-#     txt += ['           Yield     Value Change']
-#     txt += ['             (%)       ($)    (%)']
-#     txt += ['          ------------------------']
-#
-#
-#     if not isinstance(ytm, list):
-#         ytm = [ytm]
-#         values = [values]
-#     for iytm, ivalue in zip(ytm, values):
-#         fmt = '          {:6.2f} {:9.2f} {:6.2f}'
-#         txt += [fmt.format(iytm, ivalue, 100 * (ivalue-value)/value)]
-#
-#     print('\n'.join(txt))
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+
+    face_value = np.asarray(face_value, dtype=np.float64)
+    num_coupons = np.asarray(num_coupons, dtype=np.float64)
+    coupon = _coupon_per_period(face_value, coupon_rate, coupon_value, curve.pyr)
+    face_value, coupon, num_coupons = [np.ravel(param) for param in
+                                       np.broadcast_arrays(face_value, coupon, num_coupons)]
+
+    shocks = np.asarray(shocks, dtype=np.float64)
+    nper = int(np.max(num_coupons))
+    if shocks.ndim == 1:
+        shocks = np.repeat(shocks[:, np.newaxis], nper, axis=1)
+    if shocks.ndim != 2 or shocks.shape[1] < nper:
+        raise ValueError('shocks must have one column for each period up to ' + str(nper))
+
+    periods = np.arange(1, nper + 1)
+    zero_rate = curve.zero_rate(periods) + shocks[:, :nper]
+    discount = np.exp(-periods * np.log1p(zero_rate / 100 / curve.pyr))
 
+    cflo = _cashflow_matrix(face_value, coupon, num_coupons, nper)
+    values = discount.dot(cflo.T)
+    base = curve.discount(periods).dot(cflo.T)
+    return pd.DataFrame(values), pd.DataFrame(values - base)
 
 
+def key_rate_durations(curve, key_rates, face_value, num_coupons, coupon_rate=None,
+                       coupon_value=None):
+    """Computes the key rate durations of a portfolio of bonds.
+
+    Args:
+        curve (DiscountCurve): discount curve. The coupons are paid at the
+            periods 1, 2, ... of the curve.
+        key_rates (list): periods of the key rates (in increasing order).
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity.
+        coupon_rate (float, list, numpy.array): nominal rate per year of the
+            face value that defines the coupon value (the coupon of each period
+            is ``coupon_rate * face_value / 100 / curve.pyr``).
+        coupon_value (float, list, numpy.array): amount of money received in
+            each period.
+
+    Returns:
+        A pandas.DataFrame with one row per bond and one column per key rate.
+
+    **Details**
+
+    A change of the key rate ``j`` moves the nominal zero rates of the curve
+    by a triangular profile equal to one at the period ``key_rates[j]`` and
+    zero at the neighbour key rates; the profiles of the first and the last
+    key rates are flat before and after them. The key rate duration is the
+    relative change of the value of the bond for this shift (in years), so
+    the key rate durations of a bond add up to its duration with respect to
+    a parallel shift of the zero rates.
+
+    The derivatives of the discount factors are computed analytically, so
+    the full matrix of durations is obtained with one matrix product of the
+    ``(B, T)`` matrix of discounted cashflows by the ``(T, K)`` matrix of
+    profiles.
+
+    **Examples**
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 5, 10], coupon_rate=[3, 3.5, 4, 4.5, 5])
+    >>> key_rate_durations(curve, key_rates=[2, 5, 10], face_value=100,
+    ...                    num_coupons=[2, 5, 10], coupon_rate=5) # doctest: +NORMALIZE_WHITESPACE
+              2         5         10
+    0  1.886832  0.000000  0.000000
+    1  0.270557  4.078901  0.000000
+    2  0.276558  0.817481  6.588714
+
+    On a semiannual curve, the coupons are paid twice a year:
+
+    >>> curve = bootstrap(nper=[2, 4, 6], coupon_rate=[5, 5.5, 6], freq='6M')
+    >>> key_rate_durations(curve, key_rates=[2, 4, 6], face_value=100,
+    ...                    num_coupons=4, coupon_rate=5.5).sum(axis=1) # doctest: +ELLIPSIS
+    0    1.869...
+    dtype: float64
+
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+
+    face_value = np.asarray(face_value, dtype=np.float64)
+    num_coupons = np.asarray(num_coupons, dtype=np.float64)
+    coupon = _coupon_per_period(face_value, coupon_rate, coupon_value, curve.pyr)
+    face_value, coupon, num_coupons = [np.ravel(param) for param in
+                                       np.broadcast_arrays(face_value, coupon, num_coupons)]
+    labels = np.ravel(key_rates).tolist()
+    key_rates = np.asarray(key_rates, dtype=np.float64)
+    if np.any(np.diff(key_rates) <= 0):
+        raise ValueError('key_rates must be in increasing order')
+
+    nper = int(np.max(num_coupons))
+    periods = np.arange(1, nper + 1)
+    discount = curve.discount(periods)
+    zero_rate = curve.zero_rate(periods)
+
+    # triangular profiles of the key rates (T, K)
+    profiles = np.empty((nper, len(key_rates)))
+    for index in range(len(key_rates)):
+        unit = np.zeros(len(key_rates))
+        unit[index] = 1
+        profiles[:, index] = np.interp(periods, key_rates, unit)
+
+    cflo = _cashflow_matrix(face_value, coupon, num_coupons, nper)
+    value = cflo.dot(discount)
+    sensitivity = cflo * (periods * discount / (1 + zero_rate / 100 / curve.pyr) / curve.pyr)
+    durations = sensitivity.dot(profiles) / value[:, np.newaxis]
+    return pd.DataFrame(durations, columns=labels)
+
+
+def sinking_fund(face_value, num_coupons, start=1):
+    """Schedule of principal payments of bonds repaid in equal parts.
+
+    Args:
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity.
+        start (int, list, numpy.array): first period with a principal payment.
+            When ``start`` is equal to ``num_coupons`` the bond is a bullet
+            bond.
+
+    Returns:
+        numpy.array with one row per bond and one column for each period
+        ``1, ..., max(num_coupons)``.
+
+    **Examples**
+
+    >>> sinking_fund(face_value=100, num_coupons=[4, 5], start=[3, 1])
+    array([[ 0.,  0., 50., 50.,  0.],
+           [20., 20., 20., 20., 20.]])
+
+    """
+    face_value, num_coupons, start = [np.ravel(param) for param in
+                                      np.broadcast_arrays(np.asarray(face_value, dtype=np.float64),
+                                                          np.asarray(num_coupons, dtype=np.int64),
+                                                          np.asarray(start, dtype=np.int64))]
+    if np.any(start < 1) or np.any(start > num_coupons):
+        raise ValueError('start must be between 1 and num_coupons')
+    periods = np.arange(1, np.max(num_coupons) + 1)
+    paying = (periods >= start[:, np.newaxis]) & (periods <= num_coupons[:, np.newaxis])
+    return np.where(paying, (face_value / (num_coupons - start + 1))[:, np.newaxis], 0.0)
+
+
+def bond_book(curve, principal, coupon_rate=0, floating=False, spread=0, index_rate=None):
+    """Values a book of fixed rate, floating rate and amortizing bonds.
+
+    Args:
+        curve (DiscountCurve): discount curve. The payments are made at the
+            periods 1, 2, ... of the curve.
+        principal (list, numpy.array): principal payments with one row per
+            bond and one column for each period ``1, ..., T``.
+        coupon_rate (float, list, numpy.array): nominal coupon rate per year
+            of the fixed rate bonds.
+        floating (bool, list, numpy.array): ``True`` for floating rate notes.
+        spread (float, list, numpy.array): spread over the index rate of the
+            floating rate notes (in percentage points).
+        index_rate (pandas.Series): nominal index rate per year with the
+            frequency of the curve; the element ``t`` fixes the coupon of the
+            period ``t``. When it is ``None``, the index is projected with
+            the forward rates of the curve.
+
+    Returns:
+        pandas.Series with the value of each bond.
+
+    **Details**
+
+    The outstanding principal of each bond at the beginning of each period
+    is computed from the schedule of principal payments, and the coupon of
+    the period is the outstanding principal times the periodic coupon rate
+    (the fixed rate, or the index rate plus the spread). All the bonds are
+    valued with a single product by the discount factors of the curve.
+
+    **Examples**
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[4, 4.5, 5, 5.5])
+    >>> principal = sinking_fund(face_value=100, num_coupons=4, start=[4, 4, 1])
+    >>> bond_book(curve, principal, coupon_rate=[5.5, 0, 5.5],
+    ...           floating=[False, True, False]) # doctest: +NORMALIZE_WHITESPACE
+    0    100.000000
+    1    100.000000
+    2    101.172353
+    dtype: float64
+
+    A floating rate note indexed to a rate series:
+
+    >>> index_rate = interest_rate(const_value=[5, 5, 5, 6, 6], start='2000', freq='A')
+    >>> bond_book(curve, principal[1], floating=True, spread=0.5,
+    ...           index_rate=index_rate) # doctest: +ELLIPSIS
+    0    101.66...
+    dtype: float64
+
+    """
+    #pylint: disable=too-many-arguments
+
+    principal = np.atleast_2d(np.asarray(principal, dtype=np.float64))
+    nper = principal.shape[1]
+    periods = np.arange(1, nper + 1)
+    discount = curve.discount(periods)
+
+    if index_rate is None:
+        index_rate = 100 * curve.pyr * (curve.discount(periods - 1) / discount - 1)
+    else:
+        if getpyr(index_rate) != curve.pyr:
+            raise ValueError('index_rate and curve must have the same frequency')
+        if len(index_rate) < nper + 1:
+            raise ValueError('index_rate must have a rate for each period up to ' + str(nper))
+        index_rate = np.asarray(index_rate, dtype=np.float64)[1:nper + 1]
+
+    coupon_rate, floating, spread = [np.ravel(param)[:, np.newaxis] for param in
+                                     np.broadcast_arrays(np.asarray(coupon_rate, dtype=np.float64),
+                                                         np.asarray(floating, dtype=bool),
+                                                         np.asarray(spread, dtype=np.float64),
+                                                         np.empty(len(principal)))[:3]]
+    rate = np.where(floating, index_rate + spread, coupon_rate)
+
+    # outstanding principal at the beginning of each period
+    balance = np.cumsum(principal[:, ::-1], axis=1)[:, ::-1]
+    cflo = principal + balance * rate / 100 / curve.pyr
+    return pd.Series(cflo.dot(discount))
+
+
+# number of years before maturity covered by the cached coupon schedules
+_SCHEDULE_YEARS = 100
+
+
+@lru_cache(maxsize=1024)
+def _coupon_dates(maturity_date, freq):
+    """Coupon dates of a bond in the ``_SCHEDULE_YEARS`` years before
+    ``maturity_date``, in ascending order. Each date is ``maturity_date``
+    moved back a whole number of coupon periods and clipped to the end of the
+    month, as with ``pandas.DateOffset``. Schedules are cached, so the bonds
+    sharing the maturity and the frequency build their schedule once, whatever
+    their settlement dates."""
+    months = 12 // _FREQ2PYR[freq]
+    offsets = np.arange(_SCHEDULE_YEARS * 12 // months, -1, -1) * months
+    month = np.datetime64(maturity_date.strftime('%Y-%m'), 'M') - offsets
+    first_day = month.astype('datetime64[D]')
+    month_days = ((month + 1).astype('datetime64[D]') - first_day).astype(np.int64)
+    dates = first_day + np.minimum(maturity_date.day, month_days) - 1
+    return pd.DatetimeIndex(dates).to_period('D')
+
+
+def coupon_schedule(maturity_date, freq='A', settlement_date=None):
+    """Returns the coupon dates of a bond.
+
+    Args:
+        maturity_date (string, datetime): maturity date of the bond.
+        freq (string): frequency of the coupons: ``'A'``, ``'6M'``, ``'Q'`` or
+            ``'M'``.
+        settlement_date (string, datetime): settlement date. When it is
+            ``None``, only the coupons in the year before maturity are
+            returned.
+
+    Returns:
+        pandas.PeriodIndex (with daily frequency) with the previous coupon
+        date (on or before the settlement date) followed by the dates of the
+        remaining coupons.
+
+    Coupon dates are computed backwards from the maturity date, so the
+    settlement date must be less than 100 years before maturity.
+
+    **Examples**
+
+    >>> coupon_schedule(maturity_date='2020-06-15', freq='6M',
+    ...                 settlement_date='2018-03-01') # doctest: +NORMALIZE_WHITESPACE
+    PeriodIndex(['2017-12-15', '2018-06-15', '2018-12-15', '2019-06-15',
+                 '2019-12-15', '2020-06-15'],
+                dtype='period[D]', freq='D')
+
+    """
+    if freq not in ['A', '6M', 'Q', 'M']:
+        raise ValueError('Invalid freq value:  ' + freq.__repr__())
+    maturity_date = pd.Timestamp(maturity_date)
+    if settlement_date is None:
+        settlement_date = maturity_date - pd.DateOffset(years=1)
+    settlement_date = pd.Timestamp(settlement_date)
+    if settlement_date >= maturity_date:
+        raise ValueError('settlement_date must be before maturity_date')
+    dates = _coupon_dates(maturity_date, freq)
+    first = np.searchsorted(dates.asi8, settlement_date.to_period('D').ordinal, side='right') - 1
+    if first < 0:
+        raise ValueError('settlement_date must be less than {} years before '
+                         'maturity_date'.format(_SCHEDULE_YEARS))
+    return dates[first:]
+
+
+def dated_bond(settlement_date, maturity_date, freq='A', face_value=100,
+               coupon_rate=None, coupon_value=None, ytm=None, value=None):
+    """Computes the accrued interest and the clean and dirty prices of dated
+    bonds.
+
+    Args:
+        settlement_date (string, datetime, list): settlement date.
+        maturity_date (string, datetime, list): maturity date.
+        freq (string, list): frequency of the coupons.
+        face_value (float, list): bond's value at maturity.
+        coupon_rate (float, list): nominal rate per year of the face value
+            that defines the coupon value.
+        coupon_value (float, list): amount of money received in each coupon.
+        ytm (float, list): nominal yield-to-maturity per year (in percentage)
+            compounded with the frequency of the coupons.
+        value (float, list): clean price of the bonds. It is used to compute
+            the yield-to-maturity when ``ytm`` is ``None``.
+
+    Returns:
+        A pandas.DataFrame with one row per bond.
+
+    **Details**
+
+    The remaining coupons are paid ``w``, ``w + 1``, ..., ``w + n - 1``
+    periods after the settlement date, where ``w`` is the fraction of the
+    current coupon period between the settlement date and the next coupon
+    (actual days over actual days). Then, the dirty price is
+    ``(1 + y) ** (1 - w)`` times the price of the bond on the previous coupon
+    date, the accrued interest is ``coupon * (1 - w)`` and the clean price is
+    the dirty price less the accrued interest.
+
+    **Examples**
+
+    >>> dated_bond(settlement_date='2018-03-01', maturity_date='2020-06-15',
+    ...            freq='6M', face_value=100, coupon_rate=6,
+    ...            ytm=[5, 6, 7]) # doctest: +NORMALIZE_WHITESPACE
+       Accrued_Interest  Clean_Price  Dirty_Price Maturity_Date  Num_Coupons  YTM
+    0          1.252747   102.130697   103.383445    2020-06-15            5  5.0
+    1          1.252747    99.989226   101.241973    2020-06-15            5  6.0
+    2          1.252747    97.903973    99.156720    2020-06-15            5  7.0
+
+    The yield-to-maturity is computed from the clean price:
+
+    >>> x = dated_bond(settlement_date='2018-03-01', maturity_date='2020-06-15',
+    ...                freq='6M', face_value=100, coupon_rate=6, value=[101, 100])
+    >>> x.YTM.round(6).tolist()
+    [5.524675, 5.994901]
+
+    Bonds with different maturities and frequencies:
+
+    >>> dated_bond(settlement_date='2018-03-01', maturity_date=['2020-06-15', '2025-01-31'],
+    ...            freq=['6M', 'Q'], coupon_rate=6, ytm=6) # doctest: +NORMALIZE_WHITESPACE
+       Accrued_Interest  Clean_Price  Dirty_Price Maturity_Date  Num_Coupons  YTM
+    0          1.252747    99.989226   101.241973    2020-06-15            5  6.0
+    1          0.488764    99.997549   100.486313    2025-01-31           28  6.0
+
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+
+    if coupon_rate is None and coupon_value is None:
+        raise ValueError('coupon_rate or coupon_value must be specified')
+    if (ytm is None) == (value is None):
+        raise ValueError('One of ytm or value must be specified')
+
+    settlement_date, maturity_date, freq = _vars2list([settlement_date, maturity_date, freq])
+    schedules = [coupon_schedule(maturity, xfreq, settlement)
+                 for settlement, maturity, xfreq in zip(settlement_date, maturity_date, freq)]
+
+    pyr = np.array([_FREQ2PYR[xfreq] for xfreq in freq], dtype=np.float64)
+    num_coupons = np.array([len(dates) - 1 for dates in schedules], dtype=np.float64)
+    elapsed = np.array([(pd.Period(settlement, freq='D').ordinal - dates[0].ordinal) /
+                        (dates[1].ordinal - dates[0].ordinal)
+                        for settlement, dates in zip(settlement_date, schedules)])
+
+    face_value = np.asarray(face_value, dtype=np.float64)
+    coupon = _coupon_per_period(face_value, coupon_rate, coupon_value, pyr)
+    accrued = coupon * elapsed
+
+    def dirty(yld):
+        sum0, _, _, vnper = _bond_sums(yld, num_coupons)
+        return (coupon * sum0 + face_value * vnper) * np.exp(elapsed * np.log1p(yld))
+
+    if ytm is None:
+        value = np.asarray(value, dtype=np.float64)
+
+        def fun(yld):
+            return dirty(yld) - accrued - value
+
+        guess, _ = np.broadcast_arrays((coupon + (face_value - value) / num_coupons) /
+                                       ((face_value + value) / 2), elapsed)
+        lower, upper = _expand_bracket(fun, np.full(guess.shape, -0.5),
+                                       np.maximum(2 * np.abs(guess), 0.1))
+        yld, _ = _newton_bisect(fun, guess, lower, upper)
+        ytm = 100 * pyr * yld
+    else:
+        ytm = np.asarray(ytm, dtype=np.float64)
+        yld = ytm / 100 / pyr
+
+    maturity = np.array([str(dates[-1]) for dates in schedules])
+    dirty_price, accrued, ytm, num_coupons, maturity = np.broadcast_arrays(dirty(yld), accrued,
+                                                                           ytm, num_coupons,
+                                                                           maturity)
+
+    return pd.DataFrame({'Accrued_Interest': accrued.ravel(),
+                         'Clean_Price': (dirty_price - accrued).ravel(),
+                         'Dirty_Price': dirty_price.ravel(),
+                         'Maturity_Date': maturity,
+                         'Num_Coupons': num_coupons.ravel().astype(int),
+                         'YTM': ytm.ravel()},
+                        columns=['Accrued_Interest', 'Clean_Price', 'Dirty_Price',
+                                 'Maturity_Date', 'Num_Coupons', 'YTM'])
+
+
+def _grid(*params):
+    """Returns the flattened cartesian product of the lists ``params``. The last
+    list changes fastest, as in nested loops."""
+    arrays = np.meshgrid(*[np.asarray(param) for param in params], indexing='ij')
+    return [array.ravel() for array in arrays]
+
+
+def _bond_value(ytm, face_value, coupon_value, num_coupons):
+    """Prices the bonds with the periodic yield ``ytm`` (in percentage) using
+    the closed form sums of ``_bond_sums``."""
+    sum0, _, _, vnper = _bond_sums(np.asarray(ytm, dtype=np.float64) / 100, num_coupons)
+    return np.atleast_1d(coupon_value * sum0 + face_value * vnper)
+
 
 if __name__ == "__main__":
     import doctest
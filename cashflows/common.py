@@ -1,4 +1,5 @@
 
+import numpy as np
 import pandas as pd
 
 def getpyr(x):
@@ -23,6 +24,9 @@ def getpyr(x):
     return 24 # 'freq = "SM"'
 
 
+# periods per year of the frequencies with coupons or payments at whole months
+_FREQ2PYR = {'A': 1, 'BA': 1, '6M': 2, '6BM': 2, 'Q': 4, 'BQ': 4, 'M': 12, 'BM': 12}
+
 
 def _vars2list(params):
     """ Converts the variables on lists of the same length
@@ -44,6 +48,96 @@ def _vars2list(params):
     return result
 
 
+def _sign_change(flower, fupper):
+    """Elements where ``fun`` changes its sign (or is zero) at the ends of the
+    bracket. Non-finite values of ``fun`` do not define a sign change."""
+    return (np.isfinite(flower) & np.isfinite(fupper) &
+            (np.sign(flower) * np.sign(fupper) <= 0))
+
+
+def _expand_bracket(fun, lower, upper, maxiter=60):
+    """Moves ``upper`` away from ``lower`` until ``fun`` changes its sign in
+    every element of the bracket (or ``maxiter`` doublings are done).
+    """
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.array(upper, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        flower = fun(lower)
+    width = upper - lower
+    for _ in range(maxiter):
+        with np.errstate(over='ignore', invalid='ignore'):
+            open_ = ~_sign_change(flower, fun(upper))
+        if not open_.any():
+            break
+        width = np.where(open_, 2 * width, width)
+        upper = np.where(open_, lower + width, upper)
+    return lower, upper
+
+
+def _newton_bisect(fun, x0, lower, upper, dfun=None, tol=1e-12, maxiter=100):
+    """Vectorized Newton-Raphson method safeguarded by bisection.
+
+    Args:
+        fun (function): elementwise function of the unknown.
+        x0 (numpy.array): starting values.
+        lower (numpy.array): lower bounds of the brackets.
+        upper (numpy.array): upper bounds of the brackets.
+        dfun (function): elementwise derivative of ``fun``. When it is ``None``
+            a central difference is used.
+        tol (float): absolute tolerance on the unknown.
+        maxiter (int): maximum number of iterations.
+
+    Returns:
+        A tuple ``(x, status)``: the roots and an integer array with ``0`` for
+        converged elements, ``1`` when ``maxiter`` was reached and ``2`` when
+        ``fun`` does not change its sign in the bracket or is not finite at its
+        ends (``x`` is ``nan``).
+
+    Each iteration is a single array operation over all the problems. The
+    Newton step is accepted when it falls inside the current bracket;
+    otherwise, the bracket is bisected.
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+    x0, lower, upper = np.broadcast_arrays(np.asarray(x0, dtype=np.float64),
+                                           np.asarray(lower, dtype=np.float64),
+                                           np.asarray(upper, dtype=np.float64))
+    lower = lower.copy()
+    upper = upper.copy()
+    with np.errstate(over='ignore', invalid='ignore'):
+        flower = fun(lower)
+        fupper = fun(upper)
+    status = np.where(_sign_change(flower, fupper), 1, 2)
+    status[(flower == 0) | (fupper == 0)] = 0
+    x = np.where(flower == 0, lower, np.where(fupper == 0, upper, x0))
+    active = status == 1
+    x = np.where(active & ((x <= lower) | (x >= upper)), (lower + upper) / 2, x)
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        with np.errstate(over='ignore', invalid='ignore'):
+            fx = fun(x)
+            if dfun is None:
+                step = 1e-7 * np.maximum(1.0, np.abs(x))
+                dfx = (fun(x + step) - fun(x - step)) / (2 * step)
+            else:
+                dfx = dfun(x)
+        left = np.sign(fx) == np.sign(flower)
+        lower = np.where(active & left, x, lower)
+        flower = np.where(active & left, fx, flower)
+        upper = np.where(active & ~left, x, upper)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xnew = x - fx / dfx
+        # a converged step is accepted even if it falls on the bracket
+        inside = np.isfinite(xnew) & (((xnew > lower) & (xnew < upper)) |
+                                      (np.abs(xnew - x) <= tol * np.maximum(1.0, np.abs(x))))
+        xnew = np.where(inside, xnew, (lower + upper) / 2)
+        xnew = np.where(fx == 0, x, xnew)
+        done = active & ((fx == 0) | (np.abs(xnew - x) <= tol * np.maximum(1.0, np.abs(x))))
+        x = np.where(active, xnew, x)
+        status[done] = 0
+        active = active & ~done
+    x = np.where(status == 2, np.nan, x)
+    return x, status
 
 
 if __name__ == "__main__":
@@ -0,0 +1,379 @@
+"""
+Discount curves
+===============================================================================
+
+Overview
+-------------------------------------------------------------------------------
+
+A discount curve stores the discount factors ``d(t)`` of the periods
+``t = 0, 1, ..., T`` of a term structure of interest rates, where ``d(0) = 1``.
+The class ``DiscountCurve`` keeps these factors in a ``numpy`` array and
+computes discount factors at arbitrary (fractional) periods by interpolating
+linearly the logarithm of the factors. This is equivalent to a constant
+forward rate inside each period. After the last period, the forward rate of
+the last period is used.
+
+The function ``bootstrap`` builds a discount curve from the prices of a set of
+coupon bonds or from a set of par yields. The bonds are sorted by maturity and
+the discount factors are computed one maturity after another; when there are
+periods between two consecutive maturities, the forward rate is assumed
+constant between them.
+
+Discount curves can be used in place of the periodic interest rate in
+``timevalue``, in place of the yield-to-maturity in ``bond``, and in place of
+the nominal interest rate in the loan functions. The method ``to_prate``
+returns the periodic forward rates of the curve as a time series.
+
+Piecewise constant rates, as the ones built by ``interest_rate`` with the
+argument ``chgpts``, can be stored compactly with the class ``PiecewiseRate``:
+only the periods where the rate changes and the new values are kept. Discount
+factors are computed in closed form per segment in ``O(K)`` operations for
+``K`` change points, and the dense time series is built only on demand.
+
+
+Functions in this module
+-------------------------------------------------------------------------------
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# cashflows.
+from cashflows.common import _expand_bracket, _newton_bisect, _FREQ2PYR
+
+
+class DiscountCurve:
+    """Discount curve with precomputed discount factors.
+
+    Args:
+        discount_factors (list, numpy.array): discount factors of the periods
+            ``0, 1, ..., T``. They are normalized by the first factor.
+        freq (string): frequency of the periods of the curve.
+        start (string): first period of the curve. It is required to
+            convert the curve into a time series.
+
+    **Examples**
+
+    >>> curve = DiscountCurve([1, 0.95, 0.90, 0.84], freq='A', start='2000')
+    >>> curve.discount([1, 1.5, 3, 4]) # doctest: +ELLIPSIS
+    array([0.95     , 0.924..., 0.84     , 0.784    ])
+
+    >>> curve.zero_rate([1, 2, 3]) # doctest: +ELLIPSIS
+    array([5.263..., 5.409..., 5.983...])
+
+    >>> curve.to_prate() # doctest: +NORMALIZE_WHITESPACE
+    2000    5.263158
+    2001    5.263158
+    2002    5.555556
+    2003    7.142857
+    Freq: A-DEC, dtype: float64
+
+    """
+
+    def __init__(self, discount_factors, freq='A', start=None):
+        discount_factors = np.asarray(discount_factors, dtype=np.float64)
+        if discount_factors.ndim != 1 or len(discount_factors) < 2:
+            raise ValueError('At least two discount factors are required')
+        if np.any(discount_factors <= 0):
+            raise ValueError('Discount factors must be positive')
+        if freq not in _FREQ2PYR:
+            raise ValueError('Invalid freq value:  ' + freq.__repr__())
+        self.discount_factors = discount_factors / discount_factors[0]
+        self.log_factors = np.log(self.discount_factors)
+        self.freq = freq
+        self.pyr = _FREQ2PYR[freq]
+        self.start = start
+        self._prate = None
+
+    def __len__(self):
+        return len(self.discount_factors)
+
+    def discount(self, time):
+        """Discount factors at the periods ``time``.
+
+        Args:
+            time (float, list, numpy.array): periods (possibly fractional).
+
+        Returns:
+            Float or numpy.array.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        if np.any(time < 0):
+            raise ValueError('Periods must be greater or equal than zero')
+        last = len(self.log_factors) - 1
+        pos = np.minimum(np.floor(time).astype(np.int64), last - 1)
+        slope = self.log_factors[pos + 1] - self.log_factors[pos]
+        return np.exp(self.log_factors[pos] + (time - pos) * slope)
+
+    def zero_rate(self, time):
+        """Nominal zero rates per year (in percentage) at the periods ``time``.
+
+        Args:
+            time (float, list, numpy.array): periods greater than zero.
+
+        Returns:
+            Float or numpy.array.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        return 100 * self.pyr * np.expm1(-np.log(self.discount(time)) / time)
+
+    def to_prate(self):
+        """Periodic forward rates of the curve as a time series. The rate of
+        period ``t`` discounts from ``t`` to ``t - 1``; the rate of the first
+        period is the rate of the second one.
+
+        Returns:
+            pandas.Series.
+        """
+        if self.start is None:
+            raise ValueError('`start` is required to convert the curve into a time series')
+        if self._prate is None:
+            prate = 100 * np.expm1(-np.diff(self.log_factors))
+            prate = np.concatenate([prate[:1], prate])
+            self._prate = pd.Series(prate,
+                                    index=pd.period_range(start=self.start,
+                                                          periods=len(prate),
+                                                          freq=self.freq))
+        return self._prate.copy()
+
+    def to_nrate(self):
+        """Nominal forward rates per year of the curve as a time series.
+
+        Returns:
+            pandas.Series.
+        """
+        return self.to_prate() * self.pyr
+
+
+class PiecewiseRate:
+    """Piecewise constant periodic interest rate stored as change points.
+
+    Args:
+        const_value (float): periodic interest rate (in percentage) of the
+            first period.
+        start (string): first period of the rate. It is required to use
+            dates as keys of ``chgpts`` and to convert the rate into a time
+            series.
+        periods (int): number of periods of the rate.
+        freq (string): frequency of the periods of the rate.
+        chgpts (dict): Dictionary indicating the new value of the rate from a
+            period ahead. The keys can be integers or valid dates.
+
+    The rate is represented as ``K`` segments (the position where each one
+    begins and its value) instead of a value for every period. The logarithm of
+    the discount factor is linear inside each segment, ``d(t) = d(t0) / (1 +
+    r) ** (t - t0)``, so discount factors are computed in closed form from the
+    factors at the change points. As in ``to_discount_factor``, the rate of
+    the first period is not used for discounting.
+
+    **Examples**
+
+    >>> prate = PiecewiseRate(1, start='2000Q1', periods=8, freq='Q', chgpts={'2000Q4': 2, 6: 3})
+    >>> prate.changes
+    array([0, 3, 6])
+    >>> prate.values
+    array([1., 2., 3.])
+    >>> prate.to_prate() # doctest: +NORMALIZE_WHITESPACE
+    2000Q1    1.0
+    2000Q2    1.0
+    2000Q3    1.0
+    2000Q4    2.0
+    2001Q1    2.0
+    2001Q2    2.0
+    2001Q3    3.0
+    2001Q4    3.0
+    Freq: Q-DEC, dtype: float64
+
+    >>> prate.discount([0, 2, 3, 7]) # doctest: +ELLIPSIS
+    array([1.        , 0.980..., 0.961..., 0.870...])
+
+    >>> PiecewiseRate.from_series(prate.to_prate()).changes
+    array([0, 3, 6])
+
+    """
+
+    def __init__(self, const_value=0, start=None, periods=None, freq='A', chgpts=None):
+        #pylint: disable=too-many-arguments
+        if periods is None or periods < 1:
+            raise ValueError('`periods` must be greater than zero')
+        if freq not in _FREQ2PYR:
+            raise ValueError('Invalid freq value:  ' + freq.__repr__())
+        self.start = start
+        self.periods = int(periods)
+        self.freq = freq
+        self.pyr = _FREQ2PYR[freq]
+        changes = {0: float(const_value)}
+        if chgpts is not None:
+            for key, value in chgpts.items():
+                if isinstance(key, str):
+                    if start is None:
+                        raise ValueError('`start` is required to use dates in `chgpts`')
+                    key = pd.Period(key, freq=freq).ordinal - pd.Period(start, freq=freq).ordinal
+                if key < 0 or key >= self.periods:
+                    raise ValueError('Change point out of range: ' + key.__repr__())
+                changes[int(key)] = float(value)
+        self.changes = np.array(sorted(changes), dtype=np.int64)
+        self.values = np.array([changes[key] for key in self.changes])
+        self._set_knots()
+
+    @classmethod
+    def from_series(cls, prate):
+        """Builds a piecewise constant rate from a time series, keeping only the
+        periods where the value changes.
+
+        Args:
+            prate (pandas.Series): Periodic interest rate.
+
+        Returns:
+            A object of the class ``PiecewiseRate``.
+        """
+        values = np.asarray(prate, dtype=np.float64)
+        changes = np.concatenate([[0], np.flatnonzero(np.diff(values)) + 1])
+        freq = prate.axes[0].freqstr.split('-')[0]
+        return cls(const_value=values[0],
+                   start=str(prate.axes[0][0]),
+                   periods=len(values),
+                   freq=freq,
+                   chgpts=dict(zip(changes[1:].tolist(), values[changes[1:]].tolist())))
+
+    def _set_knots(self):
+        """Logarithm of the discount factors at the beginning of each segment.
+        The rate of the period ``t`` discounts from ``t`` to ``t - 1``."""
+        self._knots = np.maximum(self.changes - 1, 0).astype(np.float64)
+        self._log_growth = np.log1p(self.values / 100)
+        widths = np.diff(self._knots)
+        self._log_factors = np.concatenate([[0.0], -np.cumsum(widths * self._log_growth[:-1])])
+
+    def __len__(self):
+        return self.periods
+
+    def discount(self, time):
+        """Discount factors at the periods ``time``.
+
+        Args:
+            time (float, list, numpy.array): periods (possibly fractional).
+
+        Returns:
+            Float or numpy.array.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        if np.any(time < 0):
+            raise ValueError('Periods must be greater or equal than zero')
+        pos = np.searchsorted(self._knots, time, side='right') - 1
+        return np.exp(self._log_factors[pos] - (time - self._knots[pos]) * self._log_growth[pos])
+
+    def to_prate(self):
+        """Periodic interest rate as a dense time series.
+
+        Returns:
+            pandas.Series.
+        """
+        if self.start is None:
+            raise ValueError('`start` is required to convert the rate into a time series')
+        lengths = np.diff(np.concatenate([self.changes, [self.periods]]))
+        return pd.Series(np.repeat(self.values, lengths),
+                         index=pd.period_range(start=self.start,
+                                               periods=self.periods,
+                                               freq=self.freq))
+
+    def to_curve(self):
+        """Discount curve with the discount factors of all the periods.
+
+        Returns:
+            A object of the class ``DiscountCurve``.
+        """
+        return DiscountCurve(self.discount(np.arange(self.periods)),
+                             freq=self.freq, start=self.start)
+
+
+def bootstrap(nper, coupon_rate, value=100, face_value=100, freq='A', start=None):
+    """Builds a discount curve from the prices of coupon bonds.
+
+    Args:
+        nper (list): number of periods to maturity of each bond.
+        coupon_rate (float, list): nominal coupon rate per year of the face value.
+        value (float, list): price of the bonds.
+        face_value (float, list): bond's value at maturity.
+        freq (string): frequency of the coupons and of the periods of the curve.
+        start (string): first period of the curve.
+
+    Returns:
+        A object of the class ``DiscountCurve``.
+
+    When ``value`` is equal to ``face_value``, the coupon rates are par yields.
+
+    **Examples**
+
+    Bootstrapping from par yields:
+
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[5, 5.5, 6, 6.5])
+    >>> curve.discount_factors # doctest: +ELLIPSIS
+    array([1.        , 0.952..., 0.898..., 0.838..., 0.774...])
+
+    Bonds with gaps between maturities:
+
+    >>> curve = bootstrap(nper=[2, 6, 10], coupon_rate=[4, 5, 6], value=[99, 98, 100],
+    ...                   freq='6M', start='2000-01')
+    >>> curve.zero_rate([2, 6, 10]) # doctest: +ELLIPSIS
+    array([5.037..., 5.753..., 6.038...])
+
+    The bonds are priced back by the curve:
+
+    >>> times = np.arange(1, 11)
+    >>> round(2.5 * curve.discount(times[:6]).sum() + 100 * curve.discount(6), 8)
+    98.0
+
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+
+    nper, coupon_rate, value, face_value = np.broadcast_arrays(
+        np.asarray(nper, dtype=np.int64),
+        np.asarray(coupon_rate, dtype=np.float64),
+        np.asarray(value, dtype=np.float64),
+        np.asarray(face_value, dtype=np.float64))
+    if freq not in _FREQ2PYR:
+        raise ValueError('Invalid freq value:  ' + freq.__repr__())
+    if np.any(nper < 1):
+        raise ValueError('Number of periods must be greater than zero')
+    if len(np.unique(nper)) != len(nper.ravel()):
+        raise ValueError('Bonds must have different maturities')
+
+    order = np.argsort(nper.ravel())
+    coupon = coupon_rate.ravel()[order] * face_value.ravel()[order] / 100 / _FREQ2PYR[freq]
+    nper, value, face_value = nper.ravel()[order], value.ravel()[order], face_value.ravel()[order]
+
+    factors = np.ones(nper[-1] + 1)
+    last = 0
+    annuity = 0.0
+    for xnper, xcoupon, xvalue, xface in zip(nper, coupon, value, face_value):
+        #
+        # the discount factors of the periods last + 1, ..., xnper are
+        # factors[last] * x ** j, where x = 1 / (1 + forward rate)
+        #
+        gap = np.arange(1, xnper - last + 1)
+
+        def fun(x, xcoupon=xcoupon, xvalue=xvalue, xface=xface, gap=gap):
+            powers = np.power.outer(np.atleast_1d(x), gap)
+            return (xcoupon * annuity + factors[last] * (xcoupon * powers.sum(axis=-1) +
+                                                         xface * powers[..., -1]) - xvalue)
+
+        if xnper == last + 1:
+            root = (xvalue - xcoupon * annuity) / (xcoupon + xface) / factors[last]
+        else:
+            lower, upper = _expand_bracket(fun, [0.0], [1.5])
+            root, status = _newton_bisect(fun, [1.0], lower, upper)
+            if status[0] != 0:
+                raise ValueError('The price of the bond with ' + str(xnper) +
+                                 ' periods can not be matched')
+            root = root[0]
+        factors[last + 1:xnper + 1] = factors[last] * root ** gap
+        annuity += factors[last + 1:xnper + 1].sum()
+        last = xnper
+
+    return DiscountCurve(factors, freq=freq, start=start)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,294 @@
+"""
+Short rate lattices
+===============================================================================
+
+Overview
+-------------------------------------------------------------------------------
+
+Bonds with embedded options (callable and putable bonds) are valued on a
+recombining binomial lattice of short rates. The class ``ShortRateLattice``
+builds the lattice for the periods of a discount curve and calibrates it so
+that the lattice reproduces the discount factors of the curve. Two models are
+implemented:
+
+* ``'HL'`` (Ho-Lee): the short rate of the node ``j`` of the period ``i`` is
+  ``a[i] + sigma * sqrt(dt) * (2 * j - i)``, where ``sigma`` is the normal
+  volatility of the short rate.
+
+* ``'BDT'`` (Black-Derman-Toy): the short rate is
+  ``a[i] * exp(sigma * sqrt(dt) * (2 * j - i))``, where ``sigma`` is the
+  lognormal volatility of the short rate.
+
+In both models ``dt = 1 / pyr`` and the short rates are continuously
+compounded rates per year. The drift ``a[i]`` of each period is computed by
+forward induction using the Arrow-Debreu prices of the nodes: in closed form
+for the Ho-Lee model and with a safeguarded Newton-Raphson method for the
+Black-Derman-Toy model.
+
+The function ``option_bond`` values many bonds on the same lattice at once:
+the backward induction is done over arrays with one row per bond and one
+column per node of each period. The function ``option_adjusted_spread``
+computes the spread over the short rates that matches the market prices of
+the bonds.
+
+
+Functions in this module
+-------------------------------------------------------------------------------
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# cashflows.
+from cashflows.common import _expand_bracket, _newton_bisect
+from cashflows.curve import DiscountCurve
+
+
+class ShortRateLattice:
+    """Binomial lattice of short rates calibrated to a discount curve.
+
+    Args:
+        curve (DiscountCurve): discount curve.
+        volatility (float): volatility of the short rate per year (in
+            percentage). It is a normal volatility for the Ho-Lee model and a
+            lognormal volatility for the Black-Derman-Toy model.
+        nper (int): number of periods of the lattice (by default, the number
+            of periods of the curve).
+        model (string): ``'HL'`` (Ho-Lee) or ``'BDT'`` (Black-Derman-Toy).
+
+    **Examples**
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[4, 4.5, 5, 5.5])
+    >>> lattice = ShortRateLattice(curve, volatility=20, model='BDT')
+    >>> lattice.rates.round(4) # doctest: +NORMALIZE_WHITESPACE
+    array([[ 3.9221,     nan,     nan,     nan],
+           [ 3.939 ,  5.8763,     nan,     nan],
+           [ 3.8232,  5.7035,  8.5086,     nan],
+           [ 3.6351,  5.4229,  8.09  , 12.0688]])
+
+    The lattice reproduces the discount factors of the curve:
+
+    >>> lattice.discount_factors().round(6) # doctest: +NORMALIZE_WHITESPACE
+    array([1.      , 0.961538, 0.915532, 0.862997, 0.80502 ])
+    >>> curve.discount_factors.round(6) # doctest: +NORMALIZE_WHITESPACE
+    array([1.      , 0.961538, 0.915532, 0.862997, 0.80502 ])
+
+    """
+
+    def __init__(self, curve, volatility, nper=None, model='BDT'):
+        if not isinstance(curve, DiscountCurve):
+            raise TypeError('`curve` must be a DiscountCurve')
+        if model not in ['HL', 'BDT']:
+            raise ValueError('Invalid model:  ' + model.__repr__())
+        self.curve = curve
+        self.volatility = volatility
+        self.model = model
+        self.nper = len(curve) - 1 if nper is None else int(nper)
+        self.pyr = curve.pyr
+        self.dt = 1 / curve.pyr
+
+        # rates[i, j]: short rate (in percentage) of node j of period i
+        self.rates = np.full((self.nper, self.nper), np.nan)
+        arrow_debreu = np.ones(1)
+        step = volatility / 100 * np.sqrt(self.dt)
+        for period in range(self.nper):
+            spread = step * (2 * np.arange(period + 1) - period)
+            target = curve.discount(period + 1)
+            if model == 'HL':
+                drift = np.log(np.sum(arrow_debreu * np.exp(-spread * self.dt)) / target) / self.dt
+                rates = drift + spread
+            else:
+                def fun(drift, arrow_debreu=arrow_debreu, spread=spread, target=target):
+                    drift = np.asarray(drift)[..., np.newaxis]
+                    return np.sum(arrow_debreu * np.exp(-drift * np.exp(spread) * self.dt),
+                                  axis=-1) - target
+                lower, upper = _expand_bracket(fun, [0.0], [1.0])
+                drift, status = _newton_bisect(fun, [0.05], lower, upper)
+                if status[0] != 0:
+                    raise ValueError('The BDT lattice can not be calibrated at period ' +
+                                     str(period + 1))
+                rates = drift[0] * np.exp(spread)
+            self.rates[period, :period + 1] = 100 * rates
+            discounted = arrow_debreu * np.exp(-rates * self.dt) / 2
+            arrow_debreu = np.concatenate([discounted, [0]]) + np.concatenate([[0], discounted])
+
+    def discount_factors(self):
+        """Discount factors of the periods ``0, ..., nper`` implied by the lattice.
+
+        Returns:
+            numpy.array.
+        """
+        factors = np.ones(self.nper + 1)
+        arrow_debreu = np.ones(1)
+        for period in range(self.nper):
+            discounted = arrow_debreu * np.exp(-self.rates[period, :period + 1] / 100 * self.dt) / 2
+            arrow_debreu = np.concatenate([discounted, [0]]) + np.concatenate([[0], discounted])
+            factors[period + 1] = arrow_debreu.sum()
+        return factors
+
+
+def _backward_induction(lattice, face_value, coupon, num_coupons, call_price,
+                        put_price, first_exercise, spread):
+    """Values the bonds (one per row of the parameters) on the lattice. Returns
+    the values and their derivatives with respect to the spread."""
+    #pylint: disable=too-many-arguments
+    nper = int(np.max(num_coupons))
+    if nper > lattice.nper:
+        raise ValueError('The lattice has less periods than the bonds')
+    value = np.zeros((len(face_value), nper + 1))
+    dvalue = np.zeros((len(face_value), nper + 1))
+    for period in range(nper, 0, -1):
+        value, dvalue = value[:, :period + 1], dvalue[:, :period + 1]
+        exercise = (period >= first_exercise) & (period < num_coupons)
+        exercised = exercise & ((value > call_price) | (value < put_price))
+        value = np.where(exercise, np.clip(value, put_price, call_price), value)
+        dvalue = np.where(exercised, 0, dvalue)
+        value = (value +
+                 np.where(period <= num_coupons, coupon, 0) +
+                 np.where(period == num_coupons, face_value, 0))
+        rates = lattice.rates[period - 1, :period] / 100 + spread / 100
+        discount = np.exp(-rates * lattice.dt)
+        value = discount * (value[:, :-1] + value[:, 1:]) / 2
+        dvalue = discount * (dvalue[:, :-1] + dvalue[:, 1:]) / 2 - lattice.dt / 100 * value
+    return value[:, 0], dvalue[:, 0]
+
+
+def _option_bond_params(other, face_value, num_coupons, coupon_rate, call_price,
+                        put_price, first_exercise, pyr):
+    """Broadcasts the parameters of the bonds to column vectors. ``other`` is
+    the price or the spread of the bonds."""
+    #pylint: disable=too-many-arguments
+    call_price = np.inf if call_price is None else call_price
+    put_price = -np.inf if put_price is None else put_price
+    params = np.broadcast_arrays(np.asarray(other, dtype=np.float64),
+                                 np.asarray(face_value, dtype=np.float64),
+                                 np.asarray(num_coupons, dtype=np.float64),
+                                 np.asarray(coupon_rate, dtype=np.float64),
+                                 np.asarray(call_price, dtype=np.float64),
+                                 np.asarray(put_price, dtype=np.float64),
+                                 np.asarray(first_exercise, dtype=np.float64))
+    other, face_value, num_coupons, coupon_rate, call_price, put_price, first_exercise = \
+        [np.ravel(param)[:, np.newaxis] for param in params]
+    coupon = coupon_rate * face_value / 100 / pyr
+    return other, (face_value, coupon, num_coupons, call_price, put_price, first_exercise)
+
+
+def option_bond(lattice, face_value, num_coupons, coupon_rate, call_price=None,
+                put_price=None, first_exercise=1, spread=0):
+    """Values callable and putable bonds on a short rate lattice.
+
+    Args:
+        lattice (ShortRateLattice): lattice of short rates.
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity
+            (in periods of the lattice).
+        coupon_rate (float, list, numpy.array): nominal coupon rate per year.
+        call_price (float, list, numpy.array): price at which the issuer can
+            redeem the bond (``None`` or ``numpy.inf`` for bonds without call
+            option).
+        put_price (float, list, numpy.array): price at which the holder can
+            sell back the bond (``None`` or ``-numpy.inf`` for bonds without
+            put option).
+        first_exercise (int, list, numpy.array): first period in which the
+            options can be exercised.
+        spread (float, list, numpy.array): spread over the short rates (in
+            percentage points).
+
+    Returns:
+        pandas.Series with the value of each bond.
+
+    The options are exercised just after the payment of the coupons, from the
+    period ``first_exercise`` to the period before maturity.
+
+    **Examples**
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[4, 4.5, 5, 5.5])
+    >>> lattice = ShortRateLattice(curve, volatility=20, model='BDT')
+    >>> option_bond(lattice, face_value=100, num_coupons=4, coupon_rate=5.5,
+    ...             call_price=[np.inf, 100, 101]) # doctest: +NORMALIZE_WHITESPACE
+    0    100.000000
+    1     99.155807
+    2     99.636576
+    dtype: float64
+
+    >>> option_bond(lattice, face_value=100, num_coupons=4, coupon_rate=5.5,
+    ...             put_price=100) # doctest: +ELLIPSIS
+    0    102.67...
+    dtype: float64
+
+    """
+    #pylint: disable=too-many-arguments
+    spread, params = _option_bond_params(spread, face_value, num_coupons, coupon_rate,
+                                         call_price, put_price, first_exercise, lattice.pyr)
+    return pd.Series(_backward_induction(lattice, *params, spread=spread)[0])
+
+
+def option_adjusted_spread(lattice, value, face_value, num_coupons, coupon_rate,
+                           call_price=None, put_price=None, first_exercise=1):
+    """Computes the option adjusted spread of callable and putable bonds.
+
+    Args:
+        lattice (ShortRateLattice): lattice of short rates.
+        value (float, list, numpy.array): market price of the bonds.
+        face_value (float, list, numpy.array): bond's value at maturity.
+        num_coupons (int, list, numpy.array): number of coupons before maturity
+            (in periods of the lattice).
+        coupon_rate (float, list, numpy.array): nominal coupon rate per year.
+        call_price (float, list, numpy.array): price at which the issuer can
+            redeem the bond (``None`` or ``numpy.inf`` for bonds without call
+            option).
+        put_price (float, list, numpy.array): price at which the holder can
+            sell back the bond (``None`` or ``-numpy.inf`` for bonds without
+            put option).
+        first_exercise (int, list, numpy.array): first period in which the
+            options can be exercised.
+
+    Returns:
+        pandas.Series with the spread over the short rates (in percentage
+        points) of each bond; ``nan`` when the price can not be matched.
+
+    The spreads of all the bonds are computed at once: each iteration of the
+    Newton-Raphson method values all the bonds on the lattice.
+
+    **Examples**
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[4, 4.5, 5, 5.5])
+    >>> lattice = ShortRateLattice(curve, volatility=20, model='BDT')
+    >>> option_adjusted_spread(lattice, value=[97, 98], face_value=100, num_coupons=4,
+    ...                        coupon_rate=5.5, call_price=100) # doctest: +NORMALIZE_WHITESPACE
+    0    0.773659
+    1    0.456367
+    dtype: float64
+
+    """
+    #pylint: disable=too-many-arguments
+    value, params = _option_bond_params(value, face_value, num_coupons, coupon_rate,
+                                        call_price, put_price, first_exercise, lattice.pyr)
+    value = value[:, 0]
+
+    # the values and the derivatives are computed in the same induction
+    last = {}
+
+    def fun(spread):
+        result, last['derivative'] = _backward_induction(lattice, *params,
+                                                         spread=spread[:, np.newaxis])
+        last['spread'] = spread
+        return result - value
+
+    def dfun(spread):
+        if 'spread' not in last or not np.array_equal(last['spread'], spread):
+            fun(spread)
+        return last['derivative']
+
+    lower, upper = _expand_bracket(fun, np.full(value.shape, -5.0), np.full(value.shape, 5.0))
+    spread, _ = _newton_bisect(fun, np.zeros(value.shape), lower, upper, dfun=dfun, tol=1e-10)
+    return pd.Series(spread)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -35,6 +35,7 @@ from cashflows.analysis import *
 from cashflows.tvmm import *
 from cashflows.timeseries import *
 from cashflows.common import *
+from cashflows.curve import DiscountCurve
 
 ##
 ## base class for computations
@@ -93,7 +94,8 @@ def fixed_ppal_loan(amount, nrate, grace=0, dispoints=0, orgpoints=0,
 
     Args:
         amount (float): Loan amount.
-        nrate (float, pandas.Series): nominal interest rate per year.
+        nrate (float, pandas.Series, DiscountCurve): nominal interest rate per year
+            or discount curve (the nominal forward rates of the curve are used).
         grace (int): number of grace periiods without paying principal.
         dispoints (float): Discount points of the loan.
         orgpoints (float): Origination points of the loan.
@@ -358,6 +360,9 @@ def fixed_ppal_loan(amount, nrate, grace=0, dispoints=0, orgpoints=0,
     """
     #pylint: disable-msg=too-many-arguments
 
+    if isinstance(nrate, DiscountCurve):
+        nrate = nrate.to_nrate()
+
     if not isinstance(nrate, pd.Series):
         TypeError('nrate must be a pandas.Series object.')
 
@@ -438,7 +443,8 @@ def bullet_loan(amount, nrate, dispoints=0, orgpoints=0, prepmt=None):
 
     Args:
         amount (float): Loan amount.
-        nrate (float, pandas.Series): nominal interest rate per year.
+        nrate (float, pandas.Series, DiscountCurve): nominal interest rate per year
+            or discount curve (the nominal forward rates of the curve are used).
         dispoints (float): Discount points of the loan.
         orgpoints (float): Origination points of the loan.
         prepmt (pandas.Series): generic cashflow representing prepayments.
@@ -480,7 +486,23 @@ def bullet_loan(amount, nrate, dispoints=0, orgpoints=0, prepmt=None):
     2020Q2           1000.0
     2020Q3              0.0
 
+    The interest payments of a loan can be computed using the forward rates
+    of a discount curve:
+
+    >>> from cashflows.curve import bootstrap
+    >>> curve = bootstrap(nper=[1, 2, 3, 4], coupon_rate=[8, 9, 10, 11], freq='Q', start='2018Q1')
+    >>> bullet_loan(amount=1000, nrate=curve).Int_Payment.round(4)  # doctest: +NORMALIZE_WHITESPACE
+    2018Q1     0.0000
+    2018Q2    20.0000
+    2018Q3    25.0627
+    2018Q4    30.2156
+    2019Q1    35.4895
+    Freq: Q-DEC, Name: Int_Payment, dtype: float64
+
     """
+    if isinstance(nrate, DiscountCurve):
+        nrate = nrate.to_nrate()
+
     if not isinstance(nrate, pd.Series):
         raise TypeError("nrate must be a pandas.Series object")
 
@@ -646,7 +668,8 @@ def buydown_loan(amount, nrate, grace=0, dispoints=0, orgpoints=0, prepmt=None):
 
     Args:
         amount (float): Loan amount.
-        nrate (float, pandas.Series): nominal interest rate per year.
+        nrate (float, pandas.Series, DiscountCurve): nominal interest rate per year
+            or discount curve (the nominal forward rates of the curve are used).
         grace (int): numner of grace periods without paying the principal.
         dispoints (float): Discount points of the loan.
         orgpoints (float): Origination points of the loan.
@@ -678,17 +701,17 @@ def buydown_loan(amount, nrate, grace=0, dispoints=0, orgpoints=0, prepmt=None):
     2018Q3       118.088816      20.0   123.993257     5.904441    118.088816
     <BLANKLINE>
             End_Ppal_Amount
-    2016Q1     1.000000e+03
-    2016Q2     9.107412e+02
-    2016Q3     8.192510e+02
-    2016Q4     7.254735e+02
-    2017Q1     6.293516e+02
-    2017Q2     5.368259e+02
-    2017Q3     4.396740e+02
-    2017Q4     3.376644e+02
-    2018Q1     2.305544e+02
-    2018Q2     1.180888e+02
-    2018Q3     1.136868e-13
+    2016Q1      1000.000000
+    2016Q2       910.741237
+    2016Q3       819.251005
+    2016Q4       725.473517
+    2017Q1       629.351591
+    2017Q2       536.825914
+    2017Q3       439.673952
+    2017Q4       337.664393
+    2018Q1       230.554356
+    2018Q2       118.088816
+    2018Q3         0.000000
 
     >>> pmt = cashflow(const_value=0, start='2016Q1', periods=11, freq='Q')
     >>> pmt['2017Q4'] = 200
@@ -713,20 +736,23 @@ def buydown_loan(amount, nrate, grace=0, dispoints=0, orgpoints=0, prepmt=None):
     2018Q3        48.144328      20.0    50.551544     2.407216     48.144328
     <BLANKLINE>
             End_Ppal_Amount
-    2016Q1     1.000000e+03
-    2016Q2     9.107412e+02
-    2016Q3     8.192510e+02
-    2016Q4     7.254735e+02
-    2017Q1     6.293516e+02
-    2017Q2     5.368259e+02
-    2017Q3     4.396740e+02
-    2017Q4     1.376644e+02
-    2018Q1     9.399607e+01
-    2018Q2     4.814433e+01
-    2018Q3     4.263256e-14
+    2016Q1      1000.000000
+    2016Q2       910.741237
+    2016Q3       819.251005
+    2016Q4       725.473517
+    2017Q1       629.351591
+    2017Q2       536.825914
+    2017Q3       439.673952
+    2017Q4       137.664393
+    2018Q1        93.996068
+    2018Q2        48.144328
+    2018Q3         0.000000
 
     """
 
+    if isinstance(nrate, DiscountCurve):
+        nrate = nrate.to_nrate()
+
     if not isinstance(nrate, pd.Series):
         TypeError('nrate must be a pandas.Series object.')
 
@@ -20,10 +20,23 @@ In addition, it is possible to compute discount and compounidng factors.
 
 * ``to_discount_factor``: Returns a list of discount factors calculated as 1 / (1 + r)^(t - t0).
 * ``to_compound_factor``: Returns a list of compounding factors calculated as (1 + r)^(t - t0).
+* ``to_discount_factor_matrix``: Returns the discount factors of many base
+  dates at once as a table.
+
+Discount factors are transformed into zero rates, forward rates or par yields
+with ``discount2rate``, and back with ``rate2discount``. The rates can be
+compounded with any frequency or continuously, and the transforms are
+vectorized over time series and over scenario matrices.
 
 
 Finally, also it is possible to compute a fixed equivalent rate given interest
-rate changing over time using ``equivalent_rate``.
+rate changing over time using ``equivalent_rate``, and the equivalent rate of
+every rolling or expanding window of a time series using
+``rolling_equivalent_rate``.
+
+When the rate and ``pyr`` are numbers, the conversions are computed directly
+with floats, without building ``pandas`` objects; ``numpy`` arrays are
+transformed elementwise and ``pandas.Series`` keep their index.
 
 
 Functions in this module
@@ -38,17 +51,27 @@ import pandas as pd
 from cashflows.timeseries import *
 from cashflows.common import *
 
+# scalar types computed without building pandas objects. The speedup over the
+# pandas path (a single element series) can be measured with:
+#
+#   python -m timeit -s "from cashflows.rate import effrate" "effrate(nrate=10, pyr=12)"
+#   python -m timeit -s "import pandas as pd" -s "from cashflows.rate import effrate" \
+#       -s "x = pd.Series([10.0], index=pd.period_range('2000', periods=1, freq='A'))" \
+#       "effrate(nrate=x)"
+#
+_SCALARS = (int, float, np.integer, np.floating)
+
 def effrate(nrate=None, prate=None, pyr=1):
     """
     Computes the effective interest rate given the nominal interest rate or the periodic interest rate.
 
     Args:
-        nrate (float, pandas.Series): Nominal interest rate.
-        prate (float, pandas.Series): Periodic interest rate.
-        pyr(int): Number of compounding periods per year.
+        nrate (float, pandas.Series, numpy.array): Nominal interest rate.
+        prate (float, pandas.Series, numpy.array): Periodic interest rate.
+        pyr(int, numpy.array): Number of compounding periods per year.
 
     Returns:
-        Effective interest rate(float, pandas.Series).
+        Effective interest rate(float, pandas.Series, numpy.array).
 
     **Examples**
 
@@ -141,6 +164,14 @@ def effrate(nrate=None, prate=None, pyr=1):
     2005-12    12.36
     Freq: 6M, dtype: float64
 
+    Numpy arrays are transformed elementwise; for a matrix of rates (one row
+    per scenario and one column per period) all the rates are transformed
+    at once.
+
+    >>> effrate(nrate=np.array([[10, 12], [14, 16]]), pyr=12) # doctest: +NORMALIZE_WHITESPACE
+    array([[10.47130674, 12.68250301],
+           [14.93420292, 17.22707983]])
+
     """
     numnone = 0
     if nrate is None:
@@ -150,19 +181,27 @@ def effrate(nrate=None, prate=None, pyr=1):
     if numnone != 1:
         raise ValueError('One of the rates must be set to `None`')
 
+    if isinstance(pyr, _SCALARS):
+        if isinstance(nrate, _SCALARS):
+            return 100 * ((1 + nrate / 100 / pyr) ** pyr - 1)
+        if isinstance(prate, _SCALARS):
+            return 100 * ((1 + prate / 100) ** pyr - 1)
+
     if isinstance(nrate, pd.Series):
         pyr = getpyr(nrate)
-        erate = nrate.copy()
-        for index in range(len(nrate)):
-            erate[index] = 100 * (np.power(1 + nrate[index]/100/pyr, pyr) - 1)
-        return erate
+        return 100 * (np.power(1 + nrate / 100 / pyr, pyr) - 1)
 
     if isinstance(prate, pd.Series):
         pyr = getpyr(prate)
-        erate = prate.copy()
-        for index in range(len(prate)):
-            erate[index] = 100 * (np.power(1 + prate[index]/100, pyr) - 1)
-        return erate
+        return 100 * (np.power(1 + prate / 100, pyr) - 1)
+
+    if isinstance(nrate, (np.ndarray, pd.DataFrame)):
+        pyr = np.asarray(pyr)
+        return 100 * (np.power(1 + nrate / 100 / pyr, pyr) - 1)
+
+    if isinstance(prate, (np.ndarray, pd.DataFrame)):
+        pyr = np.asarray(pyr)
+        return 100 * (np.power(1 + prate / 100, pyr) - 1)
 
     if nrate is not None:
         ##
@@ -221,12 +260,12 @@ def nomrate(erate=None, prate=None, pyr=1):
     Computes the nominal interest rate given the nominal interest rate or the periodic interest rate.
 
     Args:
-        erate (float, pandas.Series): Effective interest rate.
-        prate (float, pandas.Series): Periodic interest rate.
-        pyr(int): Number of compounding periods per year.
+        erate (float, pandas.Series, numpy.array): Effective interest rate.
+        prate (float, pandas.Series, numpy.array): Periodic interest rate.
+        pyr(int, numpy.array): Number of compounding periods per year.
 
     Returns:
-        Nominal interest rate(float, pandas.Series).
+        Nominal interest rate(float, pandas.Series, numpy.array).
 
 
     **Examples**
@@ -320,19 +359,26 @@ def nomrate(erate=None, prate=None, pyr=1):
     if numnone != 1:
         raise ValueError('One of the rates must be set to `None`')
 
+    if isinstance(pyr, _SCALARS):
+        if isinstance(erate, _SCALARS):
+            return 100 * pyr * ((1 + erate / 100) ** (1. / pyr) - 1)
+        if isinstance(prate, _SCALARS):
+            return float(prate * pyr)
+
     if isinstance(erate, pd.Series):
         pyr = getpyr(erate)
-        nrate = erate.copy()
-        for index in range(len(erate)):
-            nrate[index] = 100 * pyr * (np.power(1 + erate[index]/100, 1. / pyr) - 1)
-        return nrate
+        return 100 * pyr * (np.power(1 + erate / 100, 1. / pyr) - 1)
 
     if isinstance(prate, pd.Series):
         pyr = getpyr(prate)
-        nrate = prate.copy()
-        for index in range(len(prate)):
-            nrate[index] = prate[index] * pyr
-        return nrate
+        return prate * pyr
+
+    if isinstance(erate, (np.ndarray, pd.DataFrame)):
+        pyr = np.asarray(pyr)
+        return 100 * pyr * (np.power(1 + erate / 100, 1. / pyr) - 1)
+
+    if isinstance(prate, (np.ndarray, pd.DataFrame)):
+        return prate * np.asarray(pyr)
 
 
     if erate is not None:
@@ -392,13 +438,13 @@ def perrate(nrate=None, erate=None, pyr=1):
     Computes the periodic interest rate given the nominal interest rate or the effective interest rate.
 
     Args:
-        nrate (float, pandas.Series): Nominal interest rate.
-        erate (float, pandas.Series): Effective interest rate.
-        pyr(int): Number of compounding periods per year.
+        nrate (float, pandas.Series, numpy.array): Nominal interest rate.
+        erate (float, pandas.Series, numpy.array): Effective interest rate.
+        pyr(int, numpy.array): Number of compounding periods per year.
 
 
     Returns:
-        Periodic interest rate(float, pandas.Series).
+        Periodic interest rate(float, pandas.Series, numpy.array).
 
     **Examples**
 
@@ -491,19 +537,26 @@ def perrate(nrate=None, erate=None, pyr=1):
     if numnone != 1:
         raise ValueError('One of the rates must be set to `None`')
 
+    if isinstance(pyr, _SCALARS):
+        if isinstance(nrate, _SCALARS):
+            return nrate / pyr
+        if isinstance(erate, _SCALARS):
+            return 100 * ((1 + erate / 100) ** (1. / pyr) - 1)
+
     if isinstance(nrate, pd.Series):
         pyr = getpyr(nrate)
-        prate = nrate.copy()
-        for index in range(len(nrate)):
-            prate[index] = nrate[index] / pyr
-        return prate
+        return nrate / pyr
 
     if isinstance(erate, pd.Series):
         pyr = getpyr(erate)
-        prate = erate.copy()
-        for index in range(len(erate)):
-            prate[index] = 100 * (np.power(1 + erate[index]/100, 1. / pyr) - 1)
-        return prate
+        return 100 * (np.power(1 + erate / 100, 1. / pyr) - 1)
+
+    if isinstance(nrate, (np.ndarray, pd.DataFrame)):
+        return nrate / np.asarray(pyr)
+
+    if isinstance(erate, (np.ndarray, pd.DataFrame)):
+        pyr = np.asarray(pyr)
+        return 100 * (np.power(1 + erate / 100, 1. / pyr) - 1)
 
     if nrate is not None:
         ##
@@ -664,6 +717,34 @@ def to_compound_factor(nrate=None, erate=None, prate=None, base_date=0):
         factor[time] = 1 / factor[time]
     return factor
 
+def _log_growth(nrate=None, erate=None, prate=None):
+    """Returns the logarithm of the growth factor of each period of the
+    rate, the number of periods per year and a function that converts a mean
+    logarithmic growth into a rate of the same kind of the argument."""
+    numnone = 0
+    if nrate is None:
+        numnone += 1
+    if erate is None:
+        numnone += 1
+    if prate is None:
+        numnone += 1
+    if numnone != 2:
+        raise ValueError('Two of the rates must be set to `None`')
+
+    if nrate is not None:
+        pyr = getpyr(nrate)
+        growth = np.log1p(np.asarray(nrate, dtype=np.float64) / 100 / pyr)
+        return growth, lambda mean: 100 * pyr * np.expm1(mean)
+
+    if prate is not None:
+        growth = np.log1p(np.asarray(prate, dtype=np.float64) / 100)
+        return growth, lambda mean: 100 * np.expm1(mean)
+
+    pyr = getpyr(erate)
+    growth = np.log1p(np.asarray(erate, dtype=np.float64) / 100) / pyr
+    return growth, lambda mean: 100 * np.expm1(pyr * mean)
+
+
 def equivalent_rate(nrate=None, erate=None, prate=None):
     """Returns the equivalent interest rate over a time period.
 
@@ -675,7 +756,11 @@ def equivalent_rate(nrate=None, erate=None, prate=None):
     Returns:
         float value.
 
-    Only one of the interest rate must be supplied for the computation.
+    Only one of the interest rate must be supplied for the computation. The
+    equivalent rate is of the same kind of the supplied rate. The first
+    element of the time series is not used, because the rate of each period
+    applies from the previous period. The growth factors are accumulated as a
+    sum of logarithms, which is numerically stable over long horizons.
 
     **Example**
 
@@ -685,40 +770,284 @@ def equivalent_rate(nrate=None, erate=None, prate=None):
     >>> equivalent_rate(prate=interest_rate([10]*5, start='2000Q1', freq='Q')) # doctest: +ELLIPSIS
     10.0...
 
+    >>> rate = interest_rate([0, 8, 12], start='2000Q1', freq='Q')
+    >>> equivalent_rate(nrate=rate) # doctest: +ELLIPSIS
+    9.995...
+
+    >>> equivalent_rate(erate=rate) # doctest: +ELLIPSIS
+    9.981...
 
     """
-    numnone = 0
-    if nrate is None:
-        numnone += 1
-    if erate is None:
-        numnone += 1
-    if prate is None:
-        numnone += 1
-    if numnone != 2:
-        raise ValueError('Two of the rates must be set to `None`')
+    growth, to_rate = _log_growth(nrate=nrate, erate=erate, prate=prate)
+    return float(to_rate(np.mean(growth[1:])))
 
-    if nrate is not None:
-        pyr = getpyr(nrate)
-        factor = 1
-        for element in nrate[1:]:
-            factor *= (1 + element / 100 / pyr)
-        return 100 * pyr * (factor**(1/(len(nrate) - 1)) - 1)
 
-    if prate is not None:
-        pyr = getpyr(prate)
-        factor = 1
-        for element in prate[1:]:
-            factor *= (1 + element / 100)
-        return 100  * (factor**(1/(len(prate) - 1)) - 1)
+def rolling_equivalent_rate(nrate=None, erate=None, prate=None, window=None):
+    """Returns the equivalent interest rate of every window of a time series.
 
-    if erate is not None:
-        pyr = getpyr(erate)
-        factor = 1
-        for element in erate[1:]:
-            factor *= (1 + (numpy.power(1 + element/100, 1. / pyr) - 1))
-        return 100  * (factor**(1/(len(value) - 1)) - 1)
+    Args:
+        nrate (TimeSeries): Nominal interest rate per year.
+        erate (TimeSeries): Effective interest rate per year.
+        prate (TimeSeries): Periodic interest rate.
+        window (int): number of periods of the windows. When it is ``None``,
+            the windows are expanding: they start at the beginning of the
+            time series.
+
+    Returns:
+        pandas.Series with the equivalent rate of the window that ends at each
+        period (``nan`` when the window is not complete).
+
+    The element ``t`` is the equivalent rate of the periods
+    ``t - window + 1, ..., t``; as in ``equivalent_rate``, the first element of
+    the time series is not used. All the windows are computed in one pass from
+    the cumulative sum of the logarithms of the growth factors.
 
+    **Example**
+
+    >>> prate = interest_rate([0, 1, 2, 3, 4, 5], start='2000Q1', freq='Q')
+    >>> rolling_equivalent_rate(prate=prate, window=2) # doctest: +NORMALIZE_WHITESPACE
+    2000Q1         NaN
+    2000Q2         NaN
+    2000Q3    1.498768
+    2000Q4    2.498780
+    2001Q1    3.498792
+    2001Q2    4.498804
+    Freq: Q-DEC, dtype: float64
+
+    >>> rolling_equivalent_rate(prate=prate) # doctest: +NORMALIZE_WHITESPACE
+    2000Q1         NaN
+    2000Q2    1.000000
+    2000Q3    1.498768
+    2000Q4    1.996732
+    2001Q1    2.493902
+    2001Q2    2.990290
+    Freq: Q-DEC, dtype: float64
+
+    """
+    series = [x for x in (nrate, erate, prate) if x is not None]
+    growth, to_rate = _log_growth(nrate=nrate, erate=erate, prate=prate)
+    cumulative = np.concatenate([[0.0], np.cumsum(growth[1:])])
+    periods = np.arange(len(cumulative), dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if window is None:
+            mean = cumulative / periods
+        else:
+            mean = np.full(len(cumulative), np.nan)
+            mean[window:] = (cumulative[window:] - cumulative[:-window]) / window
+    mean[0] = np.nan
+    return pd.Series(to_rate(mean), index=series[0].index)
+
+
+def to_discount_factor_matrix(nrate=None, erate=None, prate=None, base_date=None):
+    """Returns the discount factors 1 / (1 + r)^(t - t0) for many base dates.
+
+    Args:
+        nrate (pandas.Series): Nominal interest rate per year.
+        erate (pandas.Series): Effective interest rate per year.
+        prate (pandas.Series): Periodic interest rate.
+        base_date (list): basis times (positions or strings). When it is
+            ``None``, all the periods of the rate are used.
+
+    Returns:
+        `pandas.DataFrame` with a row for each base date and a column for each
+        period of the rate.
+
+    Only one of the interest rates must be supplied for the computation. The
+    discount factors of different base dates differ only by a scalar: the
+    factors of the base date zero are computed once (as a cumulative sum of
+    logarithms) and each row is rescaled by the factor of its base date.
+
+    **Example**
+
+    >>> nrate = interest_rate(const_value=4, periods=4, start='2016Q1', freq='Q')
+    >>> to_discount_factor_matrix(nrate=nrate) # doctest: +NORMALIZE_WHITESPACE
+              2016Q1    2016Q2    2016Q3    2016Q4
+    2016Q1  1.000000  0.990099  0.980296  0.970590
+    2016Q2  1.010000  1.000000  0.990099  0.980296
+    2016Q3  1.020100  1.010000  1.000000  0.990099
+    2016Q4  1.030301  1.020100  1.010000  1.000000
+
+    >>> to_discount_factor_matrix(nrate=nrate,
+    ...                           base_date=['2016Q4', 1]) # doctest: +NORMALIZE_WHITESPACE
+              2016Q1  2016Q2    2016Q3    2016Q4
+    2016Q4  1.030301  1.0201  1.010000  1.000000
+    2016Q2  1.010000  1.0000  0.990099  0.980296
+
+    """
+    growth, _ = _log_growth(nrate=nrate, erate=erate, prate=prate)
+    index = [x for x in (nrate, erate, prate) if x is not None][0].axes[0]
+    if base_date is None:
+        base_date = range(len(index))
+    base_date = [period2pos(index, pd.Period(x, freq=index.freq)) if isinstance(x, str) else x
+                 for x in base_date]
+    log_factor = -np.cumsum(growth)
+    matrix = np.exp(log_factor[np.newaxis, :] - log_factor[base_date, np.newaxis])
+    return pd.DataFrame(matrix, index=index[base_date], columns=index)
+
+
+def _time_axis(rate, pyr):
+    """Values of a Series, DataFrame (a row for each scenario) or array as a
+    2-D array, the number of periods per year of the time axis and a function
+    that rebuilds an object of the same type of ``rate``."""
+    if isinstance(rate, pd.Series):
+        index = rate.axes[0]
+        values = rate.values[np.newaxis, :]
+
+        def rebuild(x):
+            return pd.Series(x[0], index=index)
+    elif isinstance(rate, pd.DataFrame):
+        index = rate.columns
+        values = rate.values
+
+        def rebuild(x):
+            return pd.DataFrame(x, index=rate.index, columns=index)
+    else:
+        index = None
+        values = np.asarray(rate, dtype=np.float64)
+        shape = values.shape
+        values = np.atleast_2d(values)
+
+        def rebuild(x):
+            return x.reshape(shape)
+    if pyr is None:
+        if isinstance(index, pd.PeriodIndex):
+            pyr = getpyr(pd.Series(0, index=index))
+        else:
+            pyr = 1
+    return np.asarray(values, dtype=np.float64), pyr, rebuild
+
+
+def discount2rate(discount, kind='zero', compounding=None, pyr=None):
+    """Returns the zero rates, forward rates or par yields of a set of discount
+    factors.
+
+    Args:
+        discount (pandas.Series, pandas.DataFrame, numpy.array): discount
+            factors of the periods ``0, 1, ..., T`` (the first one is 1). For a
+            ``pandas.DataFrame``, each row is a scenario.
+        kind (string): ``'zero'``, ``'forward'`` (rate between consecutive
+            periods) or ``'par'`` (par coupon rate of a bond that matures at
+            each period).
+        compounding (int, string): number of compounding periods per year of
+            the rates, or ``'continuous'``. By default, it is the number of
+            periods per year of the discount factors. Par yields are always
+            compounded with the frequency of the coupons.
+        pyr (int): number of periods per year of the discount factors. By
+            default, it is taken from the ``pandas.PeriodIndex`` (or 1).
 
+    Returns:
+        Nominal rates per year (in percentage) of the same type of
+        ``discount``. The rate of the first period is the rate of the second
+        one.
+
+    **Examples**
+
+    >>> discount = pd.Series([1, 0.95, 0.90, 0.84],
+    ...                      index=pd.period_range('2000', periods=4, freq='A'))
+    >>> discount2rate(discount) # doctest: +NORMALIZE_WHITESPACE
+    2000    5.263158
+    2001    5.263158
+    2002    5.409255
+    2003    5.983983
+    Freq: A-DEC, dtype: float64
+
+    >>> discount2rate(discount, compounding='continuous').round(4).tolist()
+    [5.1293, 5.1293, 5.268, 5.8118]
+
+    >>> discount2rate(discount, kind='forward').round(4).tolist()
+    [5.2632, 5.2632, 5.5556, 7.1429]
+
+    >>> discount2rate(discount, kind='par').round(4).tolist()
+    [5.2632, 5.2632, 5.4054, 5.948]
+
+    Scenario matrices are transformed row by row:
+
+    >>> discount2rate(np.array([[1, 0.95, 0.90], [1, 0.96, 0.92]]), pyr=2).round(4)
+    array([[10.5263, 10.5263, 10.8185],
+           [ 8.3333,  8.3333,  8.5144]])
+
+    """
+    values, pyr, rebuild = _time_axis(discount, pyr)
+    if values.shape[1] < 2:
+        raise ValueError('At least two discount factors are required')
+    if np.any(values <= 0):
+        raise ValueError('Discount factors must be positive')
+    values = values / values[:, :1]
+    log_factors = np.log(values[:, 1:])
+    if kind == 'par':
+        result = 100 * pyr * (1 - values[:, 1:]) / np.cumsum(values[:, 1:], axis=1)
+    elif kind in ['zero', 'forward']:
+        if kind == 'zero':
+            intensity = -log_factors / np.arange(1, values.shape[1]) * pyr
+        else:
+            intensity = -np.diff(np.log(values), axis=1) * pyr
+        if compounding is None:
+            compounding = pyr
+        if compounding == 'continuous':
+            result = 100 * intensity
+        else:
+            result = 100 * compounding * np.expm1(intensity / compounding)
+    else:
+        raise ValueError('Invalid kind value:  ' + kind.__repr__())
+    return rebuild(np.concatenate([result[:, :1], result], axis=1))
+
+
+def rate2discount(rate, kind='zero', compounding=None, pyr=None):
+    """Returns the discount factors of a set of zero rates, forward rates or
+    par yields. It is the inverse of ``discount2rate``.
+
+    Args:
+        rate (pandas.Series, pandas.DataFrame, numpy.array): nominal rates per
+            year (in percentage) of the periods ``0, 1, ..., T``; the rate of
+            the first period is not used. For a ``pandas.DataFrame``, each row
+            is a scenario.
+        kind (string): ``'zero'``, ``'forward'`` or ``'par'``.
+        compounding (int, string): number of compounding periods per year of
+            the rates, or ``'continuous'``. By default, it is the number of
+            periods per year of the rates.
+        pyr (int): number of periods per year. By default, it is taken from
+            the ``pandas.PeriodIndex`` (or 1).
+
+    Returns:
+        Discount factors of the same type of ``rate``.
+
+    **Examples**
+
+    >>> rate = interest_rate([5, 5, 6, 7], start='2000', freq='A')
+    >>> rate2discount(rate, kind='forward').round(6).tolist()
+    [1.0, 0.952381, 0.898473, 0.839694]
+
+    >>> discount2rate(rate2discount(rate, kind='par'), kind='par').round(6).tolist()
+    [5.0, 5.0, 6.0, 7.0]
+
+    >>> rate2discount(rate, compounding='continuous').round(6).tolist()
+    [1.0, 0.951229, 0.88692, 0.810584]
+
+    """
+    values, pyr, rebuild = _time_axis(rate, pyr)
+    values = values[:, 1:] / 100
+    times = np.arange(1, values.shape[1] + 1)
+    if kind == 'par':
+        coupon = values / pyr
+        result = np.empty_like(values)
+        annuity = np.zeros(values.shape[0])
+        for time in range(values.shape[1]):
+            result[:, time] = (1 - coupon[:, time] * annuity) / (1 + coupon[:, time])
+            annuity += result[:, time]
+    elif kind in ['zero', 'forward']:
+        if compounding is None:
+            compounding = pyr
+        if compounding == 'continuous':
+            intensity = values / pyr
+        else:
+            intensity = compounding * np.log1p(values / compounding) / pyr
+        if kind == 'zero':
+            result = np.exp(-intensity * times)
+        else:
+            result = np.exp(-np.cumsum(intensity, axis=1))
+    else:
+        raise ValueError('Invalid kind value:  ' + kind.__repr__())
+    return rebuild(np.concatenate([np.ones((values.shape[0], 1)), result], axis=1))
 
 
 if __name__ == "__main__":
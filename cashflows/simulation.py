@@ -0,0 +1,165 @@
+"""
+Simulation of interest rates
+===============================================================================
+
+Overview
+-------------------------------------------------------------------------------
+
+The function ``short_rate_paths`` generates scenarios of the interest rate
+with a stochastic model of the short rate. All the paths are generated at once
+as a matrix with a row for each path and a column for each period. The
+following models are implemented:
+
+* ``'VASICEK'``: ``dr = speed * (mean - r) dt + volatility * dW``. The paths are
+  sampled with the exact transition of the Ornstein-Uhlenbeck process.
+
+* ``'CIR'`` (Cox-Ingersoll-Ross):
+  ``dr = speed * (mean - r) dt + volatility * sqrt(r) dW``. The paths are
+  sampled with the exact transition (a scaled noncentral chi-square
+  distribution), so the rates are never negative.
+
+* ``'HW'`` (Hull-White): ``dr = (theta(t) - speed * r) dt + volatility * dW``,
+  where ``theta(t)`` is fitted to a discount curve: the mean of the simulated
+  discount factors is equal to the discount factors of the curve.
+
+The short rates are continuously compounded rates per year and the length of
+the periods is ``dt = 1 / pyr``. The function returns the periodic interest
+rates (in percentage) and the discount factors of the paths; the rate of the
+period ``t`` discounts from ``t`` to ``t - 1``, as in ``to_discount_factor``.
+The random numbers are generated with ``numpy.random.RandomState(seed)``, so
+the scenarios are reproducible.
+
+
+Functions in this module
+-------------------------------------------------------------------------------
+
+"""
+
+import numpy as np
+import pandas as pd
+
+# cashflows.
+from cashflows.common import _FREQ2PYR
+from cashflows.curve import DiscountCurve
+
+
+def _hull_white_drift(curve, speed, volatility, nper, dt):
+    """Deterministic part of the short rates of the Hull-White model at the
+    periods ``0, ..., nper - 2``. It is computed from the variance of the
+    integral of the zero mean Ornstein-Uhlenbeck process."""
+    times = np.arange(nper - 1) * dt
+    variance = volatility ** 2 * -np.expm1(-2 * speed * times) / (2 * speed)
+    lag = np.subtract.outer(times, times)
+    cov = np.exp(-speed * np.abs(lag)) * variance[np.minimum.outer(np.arange(nper - 1),
+                                                                   np.arange(nper - 1))]
+    integral = np.concatenate([[0.0], np.cumsum(np.cumsum(cov, axis=0).diagonal() * 2
+                                                - cov.diagonal())]) * dt ** 2
+    log_factors = np.log(curve.discount(np.arange(nper)))
+    return (-np.diff(log_factors) + np.diff(integral) / 2) / dt
+
+
+def short_rate_paths(model='VASICEK', rate=5, mean=5, speed=0.1, volatility=1, nper=10,
+                     npaths=1000, freq='A', start=None, curve=None, seed=None):
+    """Generates paths of the periodic interest rate with a short rate model.
+
+    Args:
+        model (string): ``'VASICEK'``, ``'CIR'`` or ``'HW'`` (Hull-White).
+        rate (float): short rate at the first period (in percentage). It is
+            not used by the Hull-White model.
+        mean (float): long term mean of the short rate (in percentage). It is
+            not used by the Hull-White model.
+        speed (float): speed of mean reversion per year.
+        volatility (float): volatility of the short rate per year (in
+            percentage).
+        nper (int): number of periods (columns) of the paths.
+        npaths (int): number of paths (rows).
+        freq (string): frequency of the periods.
+        start (string): first period. When it is supplied, the columns are a
+            ``pandas.PeriodIndex`` compatible with ``cashflow``.
+        curve (DiscountCurve): discount curve fitted by the Hull-White model.
+        seed (int): seed of the random numbers.
+
+    Returns:
+        A tuple ``(prate, discount)`` of ``pandas.DataFrame`` objects with the
+        periodic interest rates (in percentage) and the discount factors of the
+        paths.
+
+    **Examples**
+
+    >>> prate, discount = short_rate_paths('VASICEK', rate=5, mean=6, speed=0.3,
+    ...                                    volatility=1, nper=4, npaths=3,
+    ...                                    start='2000', seed=1)
+    >>> prate # doctest: +NORMALIZE_WHITESPACE
+          2000     2001      2002      2003
+    0  5.12711  5.12711  6.895082  6.145642
+    1  5.12711  5.12711  4.918291  4.270093
+    2  5.12711  5.12711  6.193887  4.092857
+    >>> discount # doctest: +NORMALIZE_WHITESPACE
+       2000      2001      2002      2003
+    0   1.0  0.951229  0.889872  0.838350
+    1   1.0  0.951229  0.906638  0.869509
+    2   1.0  0.951229  0.895748  0.860528
+
+    The Hull-White model reproduces the discount factors of a curve:
+
+    >>> curve = DiscountCurve([1, 0.95, 0.90, 0.84, 0.79])
+    >>> _, discount = short_rate_paths('HW', speed=0.1, volatility=2, nper=5,
+    ...                                npaths=100000, curve=curve, seed=1)
+    >>> discount.mean().round(3).tolist()
+    [1.0, 0.95, 0.9, 0.84, 0.79]
+
+    """
+    #pylint: disable=too-many-arguments,too-many-locals
+    if model not in ['VASICEK', 'CIR', 'HW']:
+        raise ValueError('Invalid model value:  ' + model.__repr__())
+    if freq not in _FREQ2PYR:
+        raise ValueError('Invalid freq value:  ' + freq.__repr__())
+    if nper < 2:
+        raise ValueError('`nper` must be greater than one')
+    if speed <= 0:
+        raise ValueError('`speed` must be greater than zero')
+    if model == 'HW' and not isinstance(curve, DiscountCurve):
+        raise ValueError('A discount curve is required by the Hull-White model')
+
+    random = np.random.RandomState(seed)
+    dt = 1 / _FREQ2PYR[freq]
+    decay = np.exp(-speed * dt)
+    mean, volatility = mean / 100, volatility / 100
+
+    #
+    # short rates at the periods 0, ..., nper - 2 (the rate of the period t
+    # is the short rate at the period t - 1)
+    #
+    short = np.empty((npaths, nper - 1))
+    if model == 'CIR':
+        scale = volatility ** 2 * (1 - decay) / (4 * speed)
+        dof = 4 * speed * mean / volatility ** 2
+        short[:, 0] = rate / 100
+        for time in range(1, nper - 1):
+            short[:, time] = scale * random.noncentral_chisquare(
+                dof, short[:, time - 1] * decay / scale)
+    else:
+        stdev = volatility * np.sqrt((1 - decay ** 2) / (2 * speed))
+        noise = random.standard_normal((npaths, nper - 2)) * stdev
+        short[:, 0] = 0 if model == 'HW' else rate / 100
+        for time in range(1, nper - 1):
+            short[:, time] = short[:, time - 1] * decay + noise[:, time - 1]
+        if model == 'HW':
+            short += _hull_white_drift(curve, speed, volatility, nper, dt)
+        else:
+            short += mean * (1 - decay ** np.arange(nper - 1))
+
+    prate = 100 * np.expm1(short * dt)
+    prate = np.concatenate([prate[:, :1], prate], axis=1)
+    discount = np.exp(-np.concatenate([np.zeros((npaths, 1)),
+                                       np.cumsum(short * dt, axis=1)], axis=1))
+    if start is None:
+        columns = range(nper)
+    else:
+        columns = pd.period_range(start=start, periods=nper, freq=freq)
+    return pd.DataFrame(prate, columns=columns), pd.DataFrame(discount, columns=columns)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -8,7 +8,8 @@ Overview
 The functions in this module are used for certain compound interest calculations
 for a cashflow under the following restrictions:
 
-* Payment periods coincide with the compounding periods.
+* Payment periods coincide with the compounding periods, unless the number
+  of compounding periods per year ``cyr`` is given.
 * Payments occur at regular intervals.
 * Payments are a constant amount.
 * Interest rate is the same over all analysis period.
@@ -54,16 +55,71 @@ functions:
 In addition, the function ``amortize`` computes and returns the amortization
 schedule of a loan.
 
+When the payment frequency ``pyr`` differs from the compounding frequency
+``cyr`` (for example, monthly payments with daily or annual compounding), the
+effective interest rate per payment period is computed internally as
+``(1 + nrate / 100 / cyr) ** (cyr / pyr) - 1``; ``cyr=numpy.inf`` stands for
+continuous compounding. All the functions of this module accept the ``cyr``
+argument.
+
+Payments that change at a constant rate are modeled with the following
+closed-form functions, which use the same missing-argument interface of
+``tvmm``:
+
+* ``arithmetic_gradient``: payments that change by a constant amount ``grad``
+  each period (``pmt``, ``pmt + grad``, ``pmt + 2 * grad``, ...).
+
+* ``geometric_gradient``: payments that change by a constant percentage
+  ``grow`` each period (``pmt``, ``pmt * (1 + grow)``, ...).
+
+* ``growing_perpetuity``: a never-ending sequence of payments growing at
+  the percentage ``grow`` per period.
+
+All of them accept lists (or numpy arrays) in any argument and solve all the
+problems at once with array operations; the cost of a problem does not depend
+on the number of payments.
+
 Functions in this module
 -------------------------------------------------------------------------------
 
 """
 
+import math
 import numpy
-from cashflows.common import _vars2list
-
-
-def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, noprint=True):
+from cashflows.common import _vars2list, _expand_bracket, _newton_bisect
+
+
+def _payment_rate(nrate, pyr, cyr=None):
+    """Effective interest rate per payment period (as a fraction) for a
+    nominal rate ``nrate`` compounded ``cyr`` times per year and paid ``pyr``
+    times per year."""
+    if cyr is None:
+        return nrate/100/pyr
+    nrate = numpy.asarray(nrate, dtype=numpy.float64) / 100
+    cyr = numpy.asarray(cyr, dtype=numpy.float64)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        exponent = numpy.where(numpy.isinf(cyr),
+                               nrate / pyr,
+                               cyr / pyr * numpy.log1p(nrate / cyr))
+    return numpy.expm1(exponent)
+
+
+def _nominal_rate(prate, pyr, cyr=None):
+    """Nominal interest rate per year (in percentage) compounded ``cyr`` times
+    per year equivalent to the effective rate ``prate`` per payment period.
+    This is the inverse of ``_payment_rate``."""
+    if cyr is None:
+        return prate * 100 * pyr
+    cyr = numpy.asarray(cyr, dtype=numpy.float64)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        nrate = numpy.where(numpy.isinf(cyr),
+                            pyr * numpy.log1p(prate),
+                            cyr * numpy.expm1(pyr / cyr * numpy.log1p(prate)))
+    return 100 * nrate
+
+
+def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, noprint=True,
+         cyr=None):
     """Computes the missing argument (set to ``None``) in a model relating the
     present value, the future value, the periodic payment, the number of
     compounding periods and the nominal interest rate in a cashflow.
@@ -77,6 +133,8 @@ def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, no
         due (int): When payments are due.
         pyr (int, list): number of periods per year.
         noprint (bool): prints enhanced output
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
 
     Returns:
         Argument set to None in the function call.
@@ -89,7 +147,8 @@ def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, no
     made at the beginning or at the end of each period, a present value, a future value,
     and a nominal interest rate. The time intervals between consecutive payments are
     assumed to be equal. For internal computations, the effective interest rate per
-    period is calculated as ``nrate / pyr``.
+    period is calculated as ``nrate / pyr``. When ``cyr`` is given, the effective
+    interest rate per payment period is ``(1 + nrate / 100 / cyr) ** (cyr / pyr) - 1``.
 
 
     **Examples**
@@ -151,6 +210,17 @@ def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, no
     >>> tvmm(pval=5000, nrate=11.32/12, pmt=pmt, fval=0.0) # doctest: +ELLIPSIS
     48.0...
 
+    * Monthly payments with annual and continuous compounding:
+
+    >>> tvmm(pval=5000, nrate=11.32, nper=48, fval=0, pyr=12, cyr=1) # doctest: +ELLIPSIS
+    -128.67...
+
+    >>> tvmm(pval=5000, nrate=11.32, nper=48, fval=0, pyr=12, cyr=numpy.inf) # doctest: +ELLIPSIS
+    -130.13...
+
+    >>> tvmm(pval=5000, nper=48, pmt=-128.6745, fval=0, pyr=12, cyr=[1, 12]) # doctest: +ELLIPSIS
+    [11.31..., 10.77...]
+
 
     """
 
@@ -173,18 +243,33 @@ def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, no
     if pmt == 0.0:
         pmt = 0.0000001
 
-    nrate = numpy.array(nrate)
+    xpval, xfval, xpmt, xnper = _asarray(pval), _asarray(fval), _asarray(pmt), _asarray(nper)
+    xpyr = _asarray(pyr)
 
-    if pval is None:
-        result = numpy.pv(rate=nrate/100/pyr, nper=nper, fv=fval, pmt=pmt, when=due)
-    elif fval is None:
-        result = numpy.fv(rate=nrate/100/pyr, nper=nper, pv=pval, pmt=pmt, when=due)
-    elif nper is None:
-        result = numpy.nper(rate=nrate/100/pyr, pv=pval, fv=fval, pmt=pmt, when=due)
-    elif pmt is None:
-        result = numpy.pmt(rate=nrate/100/pyr, nper=nper, pv=pval, fv=fval, when=due)
+    def model(prate, nper):
+        """Future value of all the terms of the equation."""
+        return (xpval * numpy.power(1 + prate, nper) +
+                (1 + prate * due) * xpmt * _annuity_fv(prate, nper) + xfval)
+
+    if nrate is None:
+        shape = numpy.broadcast(xpval, xfval, xpmt, xnper, xpyr).shape
+        result = _nominal_rate(_solve_rate(lambda x: model(x, xnper), shape), xpyr, cyr)
     else:
-        result = numpy.rate(pv=pval, nper=nper, fv=fval, pmt=pmt, when=due) * 100 * pyr
+        prate = _payment_rate(_asarray(nrate), xpyr, cyr)
+        if nper is None:
+            shape = numpy.broadcast(xpval, xfval, xpmt, prate).shape
+            result = _solve_nper(lambda x: model(prate, x), shape)
+        else:
+            qrate = numpy.power(1 + prate, xnper)
+            sfactor = (1 + prate * due) * _annuity_fv(prate, xnper)
+            if pval is None:
+                result = -(xfval + xpmt * sfactor) / qrate
+            elif fval is None:
+                result = -(xpval * qrate + xpmt * sfactor)
+            else:
+                result = -(xfval + xpval * qrate) / sfactor
+
+    nrate = numpy.array(nrate)
 
     if noprint is True:
         if isinstance(result, numpy.ndarray):
@@ -275,7 +360,7 @@ def tvmm(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, no
                                  sdue))
 
 
-def pvfv(pval=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
+def pvfv(pval=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True, cyr=None):
     """Computes the missing argument (set to ``None``) in a model relating the
     present value, the future value, the number of compoundig periods
     and the nominal interest rate in a cashflow.
@@ -287,6 +372,8 @@ def pvfv(pval=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
         nper (int, list): Number of compounding periods.
         pyr (int, list): number of periods per year.
         noprint (bool): prints enhanced output
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
 
     Returns:
         The value of the parameter set to ``None`` in the function call.
@@ -305,10 +392,11 @@ def pvfv(pval=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
 
 
     """
-    return tvmm(pval=pval, fval=fval, pmt=0, nrate=nrate, nper=nper, due=0, pyr=pyr, noprint=noprint)
+    return tvmm(pval=pval, fval=fval, pmt=0, nrate=nrate, nper=nper, due=0, pyr=pyr, noprint=noprint,
+                cyr=cyr)
 
 
-def pmtfv(pmt=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
+def pmtfv(pmt=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True, cyr=None):
     """Computes the missing argument (set to ``None``) in a model relating the
     the future value, the periodic payment, the number of
     compounding periods and the nominal interest rate in a cashflow.
@@ -320,6 +408,8 @@ def pmtfv(pmt=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
         nper (int, list): Number of compounding periods.
         pyr (int, list): number of periods per year.
         noprint (bool): prints enhanced output
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
 
     Returns:
         The value of the parameter set to None in the function call.
@@ -338,10 +428,11 @@ def pmtfv(pmt=None, fval=None, nrate=None, nper=None, pyr=1, noprint=True):
 
 
     """
-    return tvmm(pval=0, fval=fval, pmt=pmt, nrate=nrate, nper=nper, due=1, pyr=pyr, noprint=noprint)
+    return tvmm(pval=0, fval=fval, pmt=pmt, nrate=nrate, nper=nper, due=1, pyr=pyr, noprint=noprint,
+                cyr=cyr)
 
 
-def pvpmt(pmt=None, pval=None, nrate=None, nper=None, pyr=1, noprint=True):
+def pvpmt(pmt=None, pval=None, nrate=None, nper=None, pyr=1, noprint=True, cyr=None):
     """Computes the missing argument (set to ``None``) in a model relating the
     present value, the periodic payment, the number of
     compounding periods and the nominal interest rate in a cashflow.
@@ -353,6 +444,8 @@ def pvpmt(pmt=None, pval=None, nrate=None, nper=None, pyr=1, noprint=True):
         nper (int, list): Number of compounding periods.
         pyr (int, list): number of periods per year.
         noprint (bool): prints enhanced output
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
 
     Returns:
         The value of the parameter set to None in the function call.
@@ -369,11 +462,20 @@ def pvpmt(pmt=None, pval=None, nrate=None, nper=None, pyr=1, noprint=True):
     This function is used to simplify the call to the ``tvmm`` function.
     See the ``tvmm`` function for details.
 
+    **Examples**
+
+    Monthly payment of a loan of 5000 at 11.32% compounded annually and daily:
+
+    >>> pvpmt(pval=5000, nrate=11.32, nper=48, pyr=12, cyr=[1, 365]) # doctest: +ELLIPSIS
+    [-128.67..., -130.13...]
+
     """
-    return tvmm(pval=pval, fval=0, pmt=pmt, nrate=nrate, nper=nper, due=0, pyr=pyr, noprint=noprint)
+    return tvmm(pval=pval, fval=0, pmt=pmt, nrate=nrate, nper=nper, due=0, pyr=pyr, noprint=noprint,
+                cyr=cyr)
 
 
-def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, noprint=True):
+def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1, noprint=True,
+             cyr=None):
     """Amortization schedule of a loan.
 
     Args:
@@ -385,6 +487,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
         due (int): When payments are due.
         pyr (int, list): number of periods per year.
         noprint (bool): prints enhanced output
+        cyr (int): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
 
     Returns:
         A tuple: (principal, interest, payment, balance)
@@ -413,7 +517,7 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     2          83.62       -26.38         8.36       -18.02        65.60
     3          65.60       -26.38         6.56       -19.82        45.78
     4          45.78       -26.38         4.58       -21.80        23.98
-    5          23.98       -26.38         2.40       -23.98         0.00
+    5          23.98       -26.38         2.40       -23.98        -0.00
 
 
     >>> amortize(pval=-100, nrate=10, nper=5, fval=0, noprint=False) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
@@ -426,7 +530,7 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     2         -83.62        26.38        -8.36        18.02       -65.60
     3         -65.60        26.38        -6.56        19.82       -45.78
     4         -45.78        26.38        -4.58        21.80       -23.98
-    5         -23.98        26.38        -2.40        23.98        -0.00
+    5         -23.98        26.38        -2.40        23.98         0.00
 
 
     In the next example, the argument ``due`` is used to indicate that the
@@ -453,8 +557,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     1         -76.02        23.98        -7.60        16.38       -59.64
     2         -59.64        23.98        -5.96        18.02       -41.62
     3         -41.62        23.98        -4.16        19.82       -21.80
-    4         -21.80        23.98        -2.18        21.80        -0.00
-    5          -0.00         0.00        -0.00        -0.00        -0.00
+    4         -21.80        23.98        -2.18        21.80         0.00
+    5           0.00         0.00         0.00         0.00         0.00
 
 
     The function returns a tuple with the columns of the amortization schedule.
@@ -472,7 +576,7 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     [0, -26.37..., -26.37..., -26.37..., -26.37..., -26.37...]
 
     >>> balance  # doctest: +ELLIPSIS
-    [100, 83.62..., 65.60..., 45.78..., 23.98..., 1...]
+    [100, 83.62..., 65.60..., 45.78..., 23.98..., ...]
 
     In the following examples, the ``sum`` function is used to sum of
     different columns of the amortization schedule.
@@ -483,8 +587,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     >>> sum(interest)  # doctest: +ELLIPSIS
     31.89...
 
-    >>> sum(principal)  # doctest: +ELLIPSIS
-    -99.99...
+    >>> round(sum(principal), 8)
+    -100.0
 
     >>> principal, interest, payment, balance = amortize(fval=0,
     ... nrate=10, nper=5, pmt=pmt) # doctest: +ELLIPSIS
@@ -492,8 +596,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     >>> sum(interest)  # doctest: +ELLIPSIS
     31.89...
 
-    >>> sum(principal)  # doctest: +ELLIPSIS
-    -99.99...
+    >>> round(sum(principal), 8)
+    -100.0
 
     >>> principal, interest, payment, balance = amortize(pval=100,
     ... fval=0, nper=5, pmt=pmt) # doctest: +ELLIPSIS
@@ -501,8 +605,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     >>> sum(interest)  # doctest: +ELLIPSIS
     31.89...
 
-    >>> sum(principal)  # doctest: +ELLIPSIS
-    -99.99...
+    >>> round(sum(principal), 8)
+    -100.0
 
 
     >>> amortize(pval=100, fval=0, nrate=10, pmt=pmt, noprint=False) # doctest: +ELLIPSIS
@@ -515,7 +619,7 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     2          83.62       -26.38         8.36       -18.02        65.60
     3          65.60       -26.38         6.56       -19.82        45.78
     4          45.78       -26.38         4.58       -21.80        23.98
-    5          23.98       -26.38         2.40       -23.98         0.00
+    5          23.98       -26.38         2.40       -23.98        -0.00
 
     >>> principal, interest, payment, balance = amortize(pval=100,
     ... fval=0, nrate=10, pmt=pmt) # doctest: +ELLIPSIS
@@ -523,8 +627,8 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     >>> sum(interest)  # doctest: +ELLIPSIS
     31.89...
 
-    >>> sum(principal)  # doctest: +ELLIPSIS
-    -99.99...
+    >>> round(sum(principal), 8)
+    -100.0
 
 
     """
@@ -550,20 +654,21 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
         pmt = 0.0000001
 
     if pval is None:
-        pval = tvmm(fval=fval, pmt=pmt, nrate=nrate, nper=nper, due=due, pyr=pyr)
+        pval = tvmm(fval=fval, pmt=pmt, nrate=nrate, nper=nper, due=due, pyr=pyr, cyr=cyr)
     elif fval is None:
-        fval = tvmm(pval=pval, pmt=pmt, nrate=nrate, nper=nper, due=due, pyr=pyr)
+        fval = tvmm(pval=pval, pmt=pmt, nrate=nrate, nper=nper, due=due, pyr=pyr, cyr=cyr)
     elif nper is None:
-        nper = tvmm(pval=pval, fval=fval, pmt=pmt, nrate=nrate, due=due, pyr=pyr)
+        nper = tvmm(pval=pval, fval=fval, pmt=pmt, nrate=nrate, due=due, pyr=pyr, cyr=cyr)
     elif pmt is None:
-        pmt = tvmm(pval=pval, fval=fval, nrate=nrate, nper=nper, due=due, pyr=pyr)
+        pmt = tvmm(pval=pval, fval=fval, nrate=nrate, nper=nper, due=due, pyr=pyr, cyr=cyr)
     else:
-        nrate = tvmm(pval=pval, fval=fval, pmt=pmt, nper=nper, due=due, pyr=pyr)
+        nrate = tvmm(pval=pval, fval=fval, pmt=pmt, nper=nper, due=due, pyr=pyr, cyr=cyr)
 
-    erate = nrate / pyr / 100
+    erate = _payment_rate(nrate, pyr, cyr)
 
     if int(nper) != nper:
         nper = int(nper + 0.9)
+    nper = int(nper)
 
     # variable definition
     begbal = [0] * (nper + 1)
@@ -617,6 +722,380 @@ def amortize(pval=None, fval=None, pmt=None, nrate=None, nper=None, due=0, pyr=1
     return None
 
 
+def _asarray(param):
+    """Converts a parameter to a float numpy.array (``None`` is preserved)."""
+    if param is None:
+        return None
+    return numpy.asarray(param, dtype=numpy.float64)
+
+
+def _tolist(result):
+    """Returns a float for scalar results and a list otherwise."""
+    return numpy.asarray(result).tolist()
+
+
+def _numnone(*params):
+    """Verifies that only one of the parameters is ``None``."""
+    if sum(1 for param in params if param is None) != 1:
+        raise ValueError('One of the params must be set to None')
+
+
+def _annuity_fv(prate, nper):
+    """Future value factor ``((1 + r) ** n - 1) / r`` of a level annuity."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        factor = numpy.expm1(nper * numpy.log1p(prate)) / prate
+    return numpy.where(numpy.abs(prate) < 1e-10, nper, factor)
+
+
+def _series(x, coeffs):
+    """Evaluates the power series with coefficients ``coeffs`` at ``x``."""
+    result = numpy.zeros_like(x)
+    for coeff in coeffs[::-1]:
+        result = result * x + coeff
+    return result
+
+
+# coefficients of (expm1(x) - x) / x ** 2 = sum x ** k / (k + 2)!
+_EXPM1_COEFFS = [1 / math.factorial(k + 2) for k in range(20)]
+
+# coefficients of (r - log1p(r)) / r ** 2 = sum (-1) ** k r ** k / (k + 2)
+_LOG1P_COEFFS = [(-1) ** k / (k + 2) for k in range(10)]
+
+
+def _gradient_fv(prate, nper):
+    """Future value factor ``((1 + r) ** n - 1 - n * r) / r ** 2`` of the
+    arithmetic gradient ``0, 1, 2, ..., n - 1``.
+
+    The factor is computed as ``n ** 2 * (L / r) ** 2 * h(n * L) - n * q(r)``,
+    where ``L = log1p(r)``, ``h(x) = (expm1(x) - x) / x ** 2`` and
+    ``q(r) = (r - L) / r ** 2``; ``h`` and ``q`` are evaluated with their power
+    series near zero, so the factor is accurate for any ``n * r``.
+    """
+    prate, nper = numpy.broadcast_arrays(numpy.asarray(prate, dtype=numpy.float64),
+                                         numpy.asarray(nper, dtype=numpy.float64))
+    lrate = numpy.log1p(prate)
+    expo = nper * lrate
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        ratio = numpy.where(prate == 0, 1, lrate / prate)
+        hfun = numpy.where(numpy.abs(expo) < 0.5,
+                           _series(expo, _EXPM1_COEFFS),
+                           (numpy.expm1(expo) - expo) / expo ** 2)
+        qfun = numpy.where(numpy.abs(prate) < 0.01,
+                           _series(prate, _LOG1P_COEFFS),
+                           (prate - lrate) / prate ** 2)
+    return nper ** 2 * ratio ** 2 * hfun - nper * qfun
+
+
+def _geometric_fv(prate, grow, nper):
+    """Future value factor ``((1 + r) ** n - (1 + g) ** n) / (r - g)`` of the
+    geometric series ``1, (1 + g), (1 + g) ** 2, ..., (1 + g) ** (n - 1)``.
+
+    With ``u = (r - g) / (1 + g)``, the factor is ``(1 + g) ** (n - 1)`` times
+    the level annuity factor ``expm1(n * log1p(u)) / u``, which has no
+    cancellation when ``r`` is close to ``g``.
+    """
+    prate, grow, nper = numpy.broadcast_arrays(numpy.asarray(prate, dtype=numpy.float64),
+                                               numpy.asarray(grow, dtype=numpy.float64),
+                                               numpy.asarray(nper, dtype=numpy.float64))
+    urate = (prate - grow) / (1 + grow)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        annuity = numpy.where(urate == 0, nper, numpy.expm1(nper * numpy.log1p(urate)) / urate)
+    return numpy.power(1 + grow, nper - 1) * annuity
+
+
+def _solve_rate(fun, shape):
+    """Solves ``fun(prate) = 0`` for the periodic rate (as a fraction)."""
+    lower, upper = _expand_bracket(fun,
+                                   numpy.full(shape, -0.99),
+                                   numpy.full(shape, 1.0))
+    prate, _ = _newton_bisect(fun, numpy.full(shape, 0.01), lower, upper)
+    return prate
+
+
+def _solve_nper(fun, shape):
+    """Solves ``fun(nper) = 0`` for the number of periods."""
+    lower, upper = _expand_bracket(fun,
+                                   numpy.zeros(shape),
+                                   numpy.full(shape, 1.0))
+    nper, _ = _newton_bisect(fun, numpy.full(shape, 10.0), lower, upper)
+    return nper
+
+
+def arithmetic_gradient(pval=None, fval=None, pmt=None, grad=None, nrate=None,
+                        nper=None, due=0, pyr=1, cyr=None):
+    """Computes the missing argument (set to ``None``) in a model relating the
+    present value, the future value, a sequence of payments changing by a
+    constant amount, the number of payments and the nominal interest rate.
+
+    Args:
+        pval (float, list): Present value.
+        fval (float, list): Future value.
+        pmt (float, list): First payment.
+        grad (float, list): Constant change of the payment in each period.
+        nrate (float, list): Nominal interest rate per year.
+        nper (int, list): Number of compounding periods.
+        due (int): When payments are due.
+        pyr (int, list): number of periods per year.
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
+
+    Returns:
+        Argument set to None in the function call.
+
+    **Details**
+
+    The payments are ``pmt``, ``pmt + grad``, ..., ``pmt + (nper - 1) * grad``
+    and the cashflow satisfies the same sign convention of ``tvmm``:
+
+        pval * (1 + r) ** nper + (1 + r * due) * (pmt * S + grad * G) + fval = 0
+
+    where ``r`` is the effective rate per payment period, ``S`` is the future value factor of a
+    level annuity and ``G`` is the future value factor of the arithmetic
+    gradient. ``pval``, ``fval``, ``pmt`` and ``grad`` are computed in closed
+    form; ``nrate`` and ``nper`` are found with a vectorized Newton-Raphson
+    method safeguarded by bisection.
+
+    **Examples**
+
+    Present value of five annual payments of 100, 110, 120, 130 and 140 at 10%:
+
+    >>> arithmetic_gradient(pmt=100, grad=10, nrate=10, nper=5, fval=0) # doctest: +ELLIPSIS
+    -447.69...
+
+    When ``grad`` is zero, the results are equal to ``tvmm``:
+
+    >>> arithmetic_gradient(pval=5000, grad=0, nrate=11.32, nper=48, fval=0, pyr=12) # doctest: +ELLIPSIS
+    -130.00...
+
+    The first payment of a loan of 1000 when each payment is 10 greater than
+    the previous one:
+
+    >>> arithmetic_gradient(pval=1000, grad=-10, nrate=10, nper=5, fval=0) # doctest: +ELLIPSIS
+    -245.69...
+
+    All the arguments support lists as inputs:
+
+    >>> arithmetic_gradient(pmt=100, grad=[0, 10, 20], nrate=10, nper=5, fval=0) # doctest: +ELLIPSIS
+    [-379.07..., -447.69..., -516.31...]
+
+    >>> arithmetic_gradient(pval=-447.6967, pmt=100, grad=10, fval=0, nper=5) # doctest: +ELLIPSIS
+    9.99...
+
+    >>> arithmetic_gradient(pval=-447.6967, pmt=100, grad=10, fval=0, nrate=10) # doctest: +ELLIPSIS
+    5.00...
+
+    When the problem has no solution, ``nan`` is returned. Payments of 50
+    do not repay a loan of 1000 at 10%:
+
+    >>> arithmetic_gradient(pval=1000, pmt=-50, grad=0, fval=0, nrate=10)
+    nan
+
+    """
+    #pylint: disable=too-many-arguments
+
+    _numnone(pval, fval, pmt, grad, nrate, nper)
+    pval, fval, pmt, grad = _asarray(pval), _asarray(fval), _asarray(pmt), _asarray(grad)
+    nrate, nper, pyr = _asarray(nrate), _asarray(nper), _asarray(pyr)
+
+    def model(prate, nper, pval=pval, fval=fval, pmt=pmt, grad=grad):
+        """Future value of all the terms of the equation."""
+        return (pval * numpy.power(1 + prate, nper) +
+                (1 + prate * due) * (pmt * _annuity_fv(prate, nper) +
+                                     grad * _gradient_fv(prate, nper)) +
+                fval)
+
+    if nrate is None:
+        shape = numpy.broadcast(pval, fval, pmt, grad, nper, pyr).shape
+        prate = _solve_rate(lambda x: model(x, nper), shape)
+        return _tolist(_nominal_rate(prate, pyr, cyr))
+
+    prate = _payment_rate(nrate, pyr, cyr)
+
+    if nper is None:
+        shape = numpy.broadcast(pval, fval, pmt, grad, prate).shape
+        return _tolist(_solve_nper(lambda x: model(prate, x), shape))
+
+    qrate = numpy.power(1 + prate, nper)
+    sfactor = (1 + prate * due) * _annuity_fv(prate, nper)
+    gfactor = (1 + prate * due) * _gradient_fv(prate, nper)
+
+    if pval is None:
+        result = -(fval + pmt * sfactor + grad * gfactor) / qrate
+    elif fval is None:
+        result = -(pval * qrate + pmt * sfactor + grad * gfactor)
+    elif pmt is None:
+        result = -(pval * qrate + fval + grad * gfactor) / sfactor
+    else:
+        result = -(pval * qrate + fval + pmt * sfactor) / gfactor
+    return _tolist(result)
+
+
+def geometric_gradient(pval=None, fval=None, pmt=None, grow=None, nrate=None,
+                       nper=None, due=0, pyr=1, cyr=None):
+    """Computes the missing argument (set to ``None``) in a model relating the
+    present value, the future value, a sequence of payments changing by a
+    constant percentage, the number of payments and the nominal interest rate.
+
+    Args:
+        pval (float, list): Present value.
+        fval (float, list): Future value.
+        pmt (float, list): First payment.
+        grow (float, list): Growth rate of the payments per period (in percentage).
+        nrate (float, list): Nominal interest rate per year.
+        nper (int, list): Number of compounding periods.
+        due (int): When payments are due.
+        pyr (int, list): number of periods per year.
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
+
+    Returns:
+        Argument set to None in the function call.
+
+    **Details**
+
+    The payments are ``pmt``, ``pmt * (1 + g)``, ...,
+    ``pmt * (1 + g) ** (nper - 1)``, with ``g = grow / 100``, and the cashflow
+    satisfies the same sign convention of ``tvmm``:
+
+        pval * (1 + r) ** nper + (1 + r * due) * pmt * F + fval = 0
+
+    where ``r`` is the effective rate per payment period and
+    ``F = ((1 + r) ** nper - (1 + g) ** nper) / (r - g)``. ``pval``, ``fval``
+    and ``pmt`` are computed in closed form; ``grow``, ``nrate`` and ``nper``
+    are found with a vectorized Newton-Raphson method safeguarded by bisection.
+
+    **Examples**
+
+    Present value of a rent of 1000 per year growing 3% per year, during 20
+    years, at 8%:
+
+    >>> geometric_gradient(pmt=1000, grow=3, nrate=8, nper=20, fval=0) # doctest: +ELLIPSIS
+    -12250.04...
+
+    When ``grow`` is zero, the results are equal to ``tvmm``:
+
+    >>> geometric_gradient(pval=5000, grow=0, nrate=11.32, nper=48, fval=0, pyr=12) # doctest: +ELLIPSIS
+    -130.00...
+
+    >>> geometric_gradient(pmt=1000, grow=[0, 3, 8], nrate=8, nper=20, fval=0) # doctest: +ELLIPSIS
+    [-9818.14..., -12250.04..., -18518.51...]
+
+    >>> geometric_gradient(pval=-12250.0414, pmt=1000, nrate=8, nper=20, fval=0) # doctest: +ELLIPSIS
+    2.99...
+
+    >>> geometric_gradient(pval=-12250.0414, pmt=1000, grow=3, nper=20, fval=0) # doctest: +ELLIPSIS
+    8.00...
+
+    >>> geometric_gradient(pval=-12250.0414, pmt=1000, grow=3, nrate=8, fval=0) # doctest: +ELLIPSIS
+    19.99...
+
+    """
+    #pylint: disable=too-many-arguments
+
+    _numnone(pval, fval, pmt, grow, nrate, nper)
+    pval, fval, pmt, grow = _asarray(pval), _asarray(fval), _asarray(pmt), _asarray(grow)
+    nrate, nper, pyr = _asarray(nrate), _asarray(nper), _asarray(pyr)
+
+    def model(prate, grow, nper, pval=pval, fval=fval, pmt=pmt):
+        """Future value of all the terms of the equation."""
+        return (pval * numpy.power(1 + prate, nper) +
+                (1 + prate * due) * pmt * _geometric_fv(prate, grow, nper) +
+                fval)
+
+    if nrate is None:
+        shape = numpy.broadcast(pval, fval, pmt, grow, nper, pyr).shape
+        prate = _solve_rate(lambda x: model(x, grow / 100, nper), shape)
+        return _tolist(_nominal_rate(prate, pyr, cyr))
+
+    prate = _payment_rate(nrate, pyr, cyr)
+
+    if grow is None:
+        shape = numpy.broadcast(pval, fval, pmt, prate, nper).shape
+        return _tolist(100 * _solve_rate(lambda x: model(prate, x, nper), shape))
+
+    grow = grow / 100
+
+    if nper is None:
+        shape = numpy.broadcast(pval, fval, pmt, prate, grow).shape
+        return _tolist(_solve_nper(lambda x: model(prate, grow, x), shape))
+
+    qrate = numpy.power(1 + prate, nper)
+    factor = (1 + prate * due) * _geometric_fv(prate, grow, nper)
+
+    if pval is None:
+        result = -(fval + pmt * factor) / qrate
+    elif fval is None:
+        result = -(pval * qrate + pmt * factor)
+    else:
+        result = -(pval * qrate + fval) / factor
+    return _tolist(result)
+
+
+def growing_perpetuity(pval=None, pmt=None, grow=0, nrate=None, due=0, pyr=1, cyr=None):
+    """Computes the missing argument (set to ``None``) in a model relating the
+    present value, the first payment, the growth rate of the payments and the
+    nominal interest rate of a perpetuity.
+
+    Args:
+        pval (float, list): Present value.
+        pmt (float, list): First payment.
+        grow (float, list): Growth rate of the payments per period (in percentage).
+        nrate (float, list): Nominal interest rate per year.
+        due (int): When payments are due.
+        pyr (int, list): number of periods per year.
+        cyr (int, list): number of compounding periods per year. When it is
+            ``None``, it is equal to ``pyr``.
+
+    Returns:
+        Argument set to None in the function call.
+
+    **Details**
+
+    The model is ``pval + (1 + r * due) * pmt / (r - g) = 0`` where ``r`` is
+    the effective rate per payment period and ``g = grow / 100``. It is only valid when
+    ``r > g``. All the arguments are computed in closed form.
+
+    **Examples**
+
+    >>> growing_perpetuity(pmt=100, nrate=10) # doctest: +ELLIPSIS
+    -1000.0...
+
+    >>> growing_perpetuity(pmt=100, grow=[0, 2, 5], nrate=10) # doctest: +ELLIPSIS
+    [-1000.0..., -1250.0..., -2000.0...]
+
+    >>> growing_perpetuity(pval=-1250, grow=2, nrate=10) # doctest: +ELLIPSIS
+    100.0...
+
+    >>> growing_perpetuity(pval=-1250, pmt=100, nrate=10, grow=None) # doctest: +ELLIPSIS
+    2.0...
+
+    >>> growing_perpetuity(pval=-1250, pmt=100, grow=2) # doctest: +ELLIPSIS
+    10.0...
+
+    """
+    #pylint: disable=too-many-arguments
+
+    _numnone(pval, pmt, grow, nrate)
+    pval, pmt, grow = _asarray(pval), _asarray(pmt), _asarray(grow)
+    nrate, pyr = _asarray(nrate), _asarray(pyr)
+
+    if nrate is None:
+        grow = grow / 100
+        prate = (pval * grow - pmt) / (pval + pmt * due)
+        return _tolist(_nominal_rate(prate, pyr, cyr))
+
+    prate = _payment_rate(nrate, pyr, cyr)
+
+    if grow is None:
+        return _tolist(100 * (prate + (1 + prate * due) * pmt / pval))
+
+    grow = grow / 100
+    if pval is None:
+        result = -(1 + prate * due) * pmt / (prate - grow)
+    else:
+        result = -pval * (prate - grow) / (1 + prate * due)
+    return _tolist(result)
+
 
 if __name__ == "__main__":
     import doctest